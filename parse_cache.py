@@ -0,0 +1,40 @@
+"""
+Parse cache shared by the test scripts (test_simple_flow.py, test_poseidonos_patterns.py)
+"""
+
+import os
+import sys
+import hashlib
+import pickle
+from pathlib import Path
+
+from src.cpp_parser import CPPCodeParser
+
+# Set to 1 to reuse parse results from .cache/ across runs
+CACHE_ENV = 'AGENT_PARSE_CACHE'
+
+
+def parse_cached(parser: CPPCodeParser, test_dir: Path, test_cpp: Path) -> None:
+    """
+    Parse test_dir, reusing the pickled parse result when AGENT_PARSE_CACHE=1
+    
+    The result is keyed by the fixture and src/cpp_parser.py, so editing
+    either re-parses, and is loaded from .cache/ on repeat runs.
+    """
+    if os.environ.get(CACHE_ENV) != '1':
+        parser.parse_project(str(test_dir))
+        return
+    
+    key = hashlib.blake2b(test_cpp.read_bytes())
+    key.update(Path(sys.modules[CPPCodeParser.__module__].__file__).read_bytes())
+    cache_path = Path('.cache') / f"parsed_{key.hexdigest()[:16]}.pkl"
+    if cache_path.exists():
+        with open(cache_path, 'rb') as f:
+            parser.restore_state(pickle.load(f))
+        print(f"Parsed {len(parser.functions)} functions and {len(parser.classes)} classes (cached)")
+        return
+    
+    parser.parse_project(str(test_dir))
+    cache_path.parent.mkdir(exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump(parser.get_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
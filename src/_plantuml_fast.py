@@ -0,0 +1,153 @@
+"""
+Sanitizer hot path for the PlantUML generator
+
+Kept free of third-party imports and fully annotated so it can be compiled
+ahead of time; the pure-Python module is used when no build is present:
+
+    mypyc src/_plantuml_fast.py
+
+The resulting extension module sits next to this file and takes precedence
+on import.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import re
+import string
+
+# Precompiled patterns used by the sanitizer hot path
+_WS_RE = re.compile(r'\s+')
+
+# Single-pass translation tables for character-level substitutions
+_NEWLINE_TABLE = str.maketrans('\n\r\t', '   ')
+_CONDITION_TABLE = str.maketrans({
+    ':': ' ',   # Colon breaks activity syntax
+    ';': None,  # Semicolon removed
+    '[': '(',
+    ']': ')',
+    '{': '(',
+    '}': ')',
+    '"': "'",
+    '\\': '/',
+    '`': "'",
+    '~': '-',
+})
+_FORBIDDEN = frozenset('@#$%^!?')
+_FORBIDDEN_TABLE = str.maketrans('', '', '@#$%^!?')
+
+
+class _FilenameTable(dict):
+    """str.translate table mapping every character outside [A-Za-z0-9_] to '_'"""
+    
+    def __missing__(self, key: int) -> str:
+        self[key] = '_'
+        return '_'
+
+
+_FILENAME_TABLE = _FilenameTable(
+    (ord(c), c) for c in string.ascii_letters + string.digits + '_'
+)
+
+
+def strip_outer_parens(text: str) -> str:
+    """
+    Strip every layer of parentheses that wraps the whole expression
+    
+    Matches parentheses in one scan and compares the leading '(' run with
+    the trailing ')' run, so "((a && b))" becomes "a && b" while
+    "(a) && (b)" is left untouched.
+    """
+    if not text.startswith('(') or not text.endswith(')'):
+        return text
+    
+    # Match every '(' with its ')' in a single pass
+    match: dict[int, int] = {}
+    stack: list[int] = []
+    for i, ch in enumerate(text):
+        if ch == '(':
+            stack.append(i)
+        elif ch == ')' and stack:
+            match[stack.pop()] = i
+    
+    # Walk the leading '(' and trailing ')' runs (whitespace allowed between)
+    start, end = 0, len(text) - 1
+    inner_start, inner_end = 0, len(text)
+    while start < end and text[start] == '(' and text[end] == ')':
+        if match.get(start) != end:
+            break
+        inner_start, inner_end = start + 1, end
+        start += 1
+        end -= 1
+        while start < end and text[start].isspace():
+            start += 1
+        while start < end and text[end].isspace():
+            end -= 1
+    
+    return text[inner_start:inner_end].strip()
+
+
+@lru_cache(maxsize=4096)
+def sanitize_cached(text: str, context: str) -> str:
+    """
+    Memoized sanitization core for PlantUMLGenerator._ultra_sanitize
+    
+    Args:
+        text: Stripped, non-empty text to sanitize
+        context: Where this text will be used (condition, label, filename)
+    """
+    # Step 1: Remove all newlines and tabs
+    text = text.translate(_NEWLINE_TABLE)
+    
+    # Step 2: Handle different contexts
+    if context == "condition":
+        # For conditions in if/while/for - VERY aggressive
+        # Remove ALL special PlantUML characters
+        text = text.translate(_CONDITION_TABLE)
+        text = text.replace('|', ' or ')  # Pipe to 'or'
+        
+        # Handle comparison operators - add spaces
+        for op in ['==', '!=', '<=', '>=', '&&', '||', '<<', '>>']:
+            text = text.replace(op, f' {op} ')
+        
+        # Remove outer parentheses if they wrap everything
+        text = strip_outer_parens(text.strip())
+        
+        # Limit length for conditions
+        max_len = 40
+        if len(text) > max_len:
+            text = text[:max_len-3] + "..."
+        
+    elif context == "label":
+        # For activity labels - less aggressive, more readable
+        text = text.replace(':', ' ')  # Still remove colons
+        text = text.replace(';', '')   # Remove semicolons
+        text = text.replace('|', ' ')  # Remove pipes
+        
+        # Limit length
+        max_len = 50
+        if len(text) > max_len:
+            text = text[:max_len-3] + "..."
+            
+    elif context == "filename":
+        # For filenames - remove all non-alphanumeric
+        text = text.translate(_FILENAME_TABLE)
+        # Collapse underscore runs and trim them from both ends
+        text = '_'.join(filter(None, text.split('_')))
+        if len(text) > 40:
+            text = text[:40]
+    
+    # Step 3: Clean up multiple spaces
+    text = _WS_RE.sub(' ', text)
+    text = text.strip()
+    
+    # Step 4: Ensure we return something valid
+    if not text or len(text) < 2:
+        return "item" if context == "label" else "check"
+    
+    # Step 5: Remove any remaining problematic characters
+    # These can break PlantUML in subtle ways
+    if not _FORBIDDEN.isdisjoint(text):
+        text = text.translate(_FORBIDDEN_TABLE)
+    
+    return text.strip()
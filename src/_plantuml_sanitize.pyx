@@ -0,0 +1,179 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled sanitizers for the v2 PlantUML generator
+
+Each sanitizer makes one pass over the code points, driven by a 128-entry
+action table for ASCII, and writes into a preallocated UCS4 buffer instead
+of chaining str.translate/re.sub calls. Build in place with:
+
+    cythonize -i src/_plantuml_sanitize.pyx
+
+plantuml_generator_v2 falls back to its pure-Python sanitizers when the
+extension has not been built.
+"""
+
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython.unicode cimport PyUnicode_FromKindAndData, PyUnicode_4BYTE_KIND, Py_UNICODE_ISSPACE
+
+# Per-character actions
+cdef enum:
+    COPY = 0
+    SPACE = 1      # whitespace or mapped to a space
+    DROP = 2
+    MAP = 3        # replaced by _PUML_MAP / nothing for labels
+    PIPE = 4       # '|' becomes ' or '
+    CMP = 5        # part of a comparison operator run
+
+cdef unsigned char _PUML_ACTION[128]
+cdef Py_UCS4 _PUML_MAP[128]
+cdef unsigned char _LABEL_ACTION[128]
+
+cdef int _i
+for _i in range(128):
+    _PUML_ACTION[_i] = COPY
+    _PUML_MAP[_i] = _i
+    _LABEL_ACTION[_i] = COPY
+for _i in (9, 10, 11, 12, 13, 28, 29, 30, 31, 32):
+    _PUML_ACTION[_i] = SPACE
+    _LABEL_ACTION[_i] = SPACE
+_PUML_ACTION[ord(';')] = DROP
+_PUML_ACTION[ord(':')] = SPACE
+_PUML_ACTION[ord('|')] = PIPE
+for _i in (ord('<'), ord('>'), ord('='), ord('!')):
+    _PUML_ACTION[_i] = CMP
+for _c, _m in (('[', '('), (']', ')'), ('{', '('), ('}', ')'), ('"', "'"), ('\\', '/')):
+    _PUML_ACTION[ord(_c)] = MAP
+    _PUML_MAP[ord(_c)] = ord(_m)
+_LABEL_ACTION[ord(';')] = DROP
+_LABEL_ACTION[ord(':')] = MAP
+_LABEL_ACTION[ord('|')] = MAP
+
+
+cdef inline unsigned char _action(unsigned char *table, Py_UCS4 ch):
+    if ch < 128:
+        return table[ch]
+    return SPACE if Py_UNICODE_ISSPACE(ch) else COPY
+
+
+def sanitize_puml(str text, int max_length):
+    """
+    Compiled core of _sanitize_for_plantuml
+
+    Args:
+        text: Stripped, non-empty text that failed the fast path
+        max_length: Maximum length before truncation
+    """
+    cdef Py_ssize_t start = 0, end = len(text), n = 0, i
+    cdef Py_UCS4 ch
+    cdef unsigned char act
+    cdef bint in_cmp = False
+    cdef Py_UCS4 *buf
+
+    # Remove outer parentheses if they wrap the entire expression
+    if end >= 2 and text[0] == u'(' and text[end - 1] == u')':
+        start += 1
+        end -= 1
+        while start < end and Py_UNICODE_ISSPACE(text[start]):
+            start += 1
+        while end > start and Py_UNICODE_ISSPACE(text[end - 1]):
+            end -= 1
+
+    # Worst case is '|' growing to ' or '
+    buf = <Py_UCS4 *>PyMem_Malloc((4 * (end - start) + 1) * sizeof(Py_UCS4))
+    if buf == NULL:
+        raise MemoryError()
+    try:
+        for i in range(start, end):
+            ch = text[i]
+            act = _action(_PUML_ACTION, ch)
+            if act == DROP:
+                continue
+            if act == CMP:
+                # Space out the whole operator run
+                if not in_cmp:
+                    if n == 0 or buf[n - 1] != u' ':
+                        buf[n] = u' '
+                        n += 1
+                    in_cmp = True
+                buf[n] = ch
+                n += 1
+                continue
+            if in_cmp:
+                buf[n] = u' '
+                n += 1
+                in_cmp = False
+            if act == SPACE:
+                if n == 0 or buf[n - 1] != u' ':
+                    buf[n] = u' '
+                    n += 1
+            elif act == PIPE:
+                if n == 0 or buf[n - 1] != u' ':
+                    buf[n] = u' '
+                    n += 1
+                buf[n] = u'o'
+                buf[n + 1] = u'r'
+                buf[n + 2] = u' '
+                n += 3
+            elif act == MAP:
+                buf[n] = _PUML_MAP[ch]
+                n += 1
+            else:
+                buf[n] = ch
+                n += 1
+        if in_cmp:
+            buf[n] = u' '
+            n += 1
+        text = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND, buf, n)
+    finally:
+        PyMem_Free(buf)
+
+    # Truncate if too long
+    if len(text) > max_length:
+        text = text[:max_length - 3] + "..."
+
+    text = text.strip()
+    return text if text else "condition"
+
+
+def sanitize_label(str label, int max_length):
+    """
+    Compiled core of _sanitize_label
+
+    Args:
+        label: Stripped, non-empty label
+        max_length: Maximum length before truncation
+    """
+    cdef Py_ssize_t n = 0
+    cdef Py_UCS4 ch
+    cdef unsigned char act
+    cdef bint prev_ws = False
+    cdef Py_UCS4 *buf
+
+    buf = <Py_UCS4 *>PyMem_Malloc((len(label) + 1) * sizeof(Py_UCS4))
+    if buf == NULL:
+        raise MemoryError()
+    try:
+        for ch in label:
+            act = _action(_LABEL_ACTION, ch)
+            if act == SPACE:
+                # Whitespace runs collapse before ':' and '|' become spaces
+                if not prev_ws:
+                    buf[n] = u' '
+                    n += 1
+                prev_ws = True
+                continue
+            prev_ws = False
+            if act == DROP:
+                continue
+            buf[n] = u' ' if act == MAP else ch
+            n += 1
+        label = PyUnicode_FromKindAndData(PyUnicode_4BYTE_KIND, buf, n)
+    finally:
+        PyMem_Free(buf)
+
+    # Truncate if needed
+    if len(label) > max_length:
+        label = label[:max_length - 3] + "..."
+
+    label = label.strip()
+    return label if label else "statement"
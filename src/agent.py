@@ -147,10 +147,7 @@ class CPPAnalysisAgent:
                     console.print("[red]No functions with control flow found.[/red]")
                     return ""
                 
-                paths = []
-                for func in funcs_with_flow:
-                    path = self.diagram_generator.generate_detailed_function_flow(func)
-                    paths.append(path)
+                paths = self.diagram_generator.generate_all_function_flows(funcs_with_flow)
                 
                 console.print(f"[green]Generated {len(paths)} function flow diagrams[/green]")
                 return paths[0] if paths else ""
@@ -87,5 +87,7 @@ class ConfigLoader:
             'output_dir': self.get('flowchart.output_dir'),
             'max_depth': self.get('flowchart.max_depth'),
             'include_comments': self.get('flowchart.include_comments'),
+            'max_workers': self.get('flowchart.max_workers'),
+            'validate': self.get('flowchart.validate', True),
         }
 
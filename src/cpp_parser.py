@@ -4,7 +4,7 @@ C++ Code Parser using tree-sitter
 
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import tree_sitter_cpp as tscpp
 from tree_sitter import Language, Parser, Node
@@ -120,6 +120,24 @@ class CPPCodeParser:
         
         print(f"Parsed {len(self.functions)} functions and {len(self.classes)} classes")
     
+    def get_state(self) -> Tuple[List[FunctionInfo], List[ClassInfo], Dict[str, str]]:
+        """
+        Get the parse results, in the form restore_state takes
+        
+        Returns:
+            (functions, classes, files_content)
+        """
+        return self.functions, self.classes, self.files_content
+    
+    def restore_state(self, state: Tuple[List[FunctionInfo], List[ClassInfo], Dict[str, str]]) -> None:
+        """
+        Replace the parse results with ones saved from get_state
+        
+        Args:
+            state: (functions, classes, files_content)
+        """
+        self.functions, self.classes, self.files_content = state
+    
     def _find_cpp_files(self, root_path: Path) -> List[Path]:
         """Find all C++ files in the project"""
         cpp_files = []
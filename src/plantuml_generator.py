@@ -3,14 +3,91 @@ PlantUML Generator for C++ projects - ULTRA-ROBUST VERSION
 Guaranteed to work with ANY C++ project including PoseidonOS
 """
 
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, Callable
 from pathlib import Path
 from dataclasses import dataclass
+from collections import defaultdict
 from rich.console import Console
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import io
 import re
 
+from ._plantuml_fast import sanitize_cached
+
 console = Console()
 
+# Inputs matching these already come out of sanitization unchanged
+_IDENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]{1,48}\Z')
+_SAFE_FILENAME_RE = re.compile(r'[A-Za-z0-9]+(?:_[A-Za-z0-9]+)*\Z')
+
+# Diagram skeletons; generators only build the body
+_ACTIVITY_TEMPLATE = "@startuml\ntitle {title}\n\n{styling}start\n\n{body}stop\n\n@enduml"
+_CLASS_TEMPLATE = "@startuml\ntitle {title}\n\n{styling}{body}\n@enduml"
+
+# Styling blocks shared by every diagram of the same kind
+_DIAMOND_SKINPARAM = (
+    "skinparam activityDiamond {\n"
+    "  BackgroundColor #FFD966\n"
+    "  BorderColor #CC9900\n"
+    "}\n"
+)
+_FLOW_SKINPARAM = (
+    "skinparam activity {\n"
+    "  BackgroundColor #B4E7CE\n"
+    "  BorderColor #2C5F2D\n"
+    "  FontSize 11\n"
+    "}\n"
+    + _DIAMOND_SKINPARAM +
+    "skinparam activityStart {\n"
+    "  BackgroundColor #4A90E2\n"
+    "}\n"
+    "skinparam activityEnd {\n"
+    "  BackgroundColor #E74C3C\n"
+    "}\n"
+    "\n"
+)
+_CALL_GRAPH_SKINPARAM = (
+    "skinparam activity {\n"
+    "  BackgroundColor #B4E7CE\n"
+    "  BorderColor #2C5F2D\n"
+    "}\n"
+    + _DIAMOND_SKINPARAM +
+    "\n"
+)
+_CLASS_SKINPARAM = (
+    "skinparam class {\n"
+    "  BackgroundColor LightBlue\n"
+    "  BorderColor Navy\n"
+    "}\n"
+    "\n"
+)
+_MODULE_SKINPARAM = (
+    "skinparam activity {\n"
+    "  BackgroundColor #E8F4F8\n"
+    "  BorderColor #4A90E2\n"
+    "}\n"
+    "\n"
+)
+
+
+# Batches smaller than this are generated in-process; pool startup costs more
+_PARALLEL_FLOW_THRESHOLD = 32
+
+# Per-process generator used by generate_all_function_flows workers
+_worker_generator: Optional['PlantUMLGenerator'] = None
+
+
+def _init_flow_worker(config: Dict[str, Any]) -> None:
+    """Create the generator once in each worker process"""
+    global _worker_generator
+    _worker_generator = PlantUMLGenerator(config)
+
+
+def _worker_generate_flow(func: Any) -> str:
+    """Generate one function flow diagram inside a worker process"""
+    return _worker_generator.generate_detailed_function_flow(func)
+
 
 class PlantUMLGenerator:
     """Generate PlantUML diagrams from C++ code analysis - ULTRA-ROBUST"""
@@ -20,7 +97,20 @@ class PlantUMLGenerator:
         self.config = config
         self.output_dir = Path(config['output_dir'])
         self.max_depth = config['max_depth']
+        # Set to false to skip the syntax check of generated (trusted) diagrams
+        self.validate = config.get('validate', True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Control-flow node type -> emitter used by _add_flow_nodes
+        self._node_emitters: Dict[str, Callable[..., None]] = {
+            'if': self._emit_if,
+            'for': self._emit_for,
+            'while': self._emit_while,
+            'switch': self._emit_switch,
+            'return': self._emit_statement,
+            'call': self._emit_statement,
+            'statement': self._emit_statement,
+        }
     
     def _ultra_sanitize(self, text: str, context: str = "general") -> str:
         """
@@ -31,90 +121,27 @@ class PlantUMLGenerator:
             text: Text to sanitize
             context: Where this text will be used (condition, label, filename)
         """
-        if not text or not str(text).strip():
+        if text:
+            text = text.strip() if isinstance(text, str) else str(text).strip()
+        if not text:
             return "item" if context == "label" else "check"
         
-        text = str(text).strip()
-        
-        # Step 1: Remove all newlines and tabs
-        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-        
-        # Step 2: Handle different contexts
-        if context == "condition":
-            # For conditions in if/while/for - VERY aggressive
-            # Remove ALL special PlantUML characters
-            text = text.replace(':', ' ')  # Colon breaks activity syntax
-            text = text.replace(';', '')   # Semicolon removed
-            text = text.replace('|', ' or ')  # Pipe to 'or'
-            text = text.replace('[', '(')
-            text = text.replace(']', ')')
-            text = text.replace('{', '(')
-            text = text.replace('}', ')')
-            text = text.replace('"', "'")
-            text = text.replace('\\', '/')
-            text = text.replace('`', "'")
-            text = text.replace('~', '-')
-            
-            # Handle comparison operators - add spaces
-            for op in ['==', '!=', '<=', '>=', '&&', '||', '<<', '>>']:
-                text = text.replace(op, f' {op} ')
-            
-            # Remove outer parentheses if they wrap everything
-            text = text.strip()
-            while text.startswith('(') and text.endswith(')'):
-                inner = text[1:-1]
-                if '(' not in inner or inner.count('(') == inner.count(')'):
-                    text = inner.strip()
-                else:
-                    break
-            
-            # Limit length for conditions
-            max_len = 40
-            if len(text) > max_len:
-                text = text[:max_len-3] + "..."
-            
-        elif context == "label":
-            # For activity labels - less aggressive, more readable
-            text = text.replace(':', ' ')  # Still remove colons
-            text = text.replace(';', '')   # Remove semicolons
-            text = text.replace('|', ' ')  # Remove pipes
-            
-            # Limit length
-            max_len = 50
-            if len(text) > max_len:
-                text = text[:max_len-3] + "..."
-                
-        elif context == "filename":
-            # For filenames - remove all non-alphanumeric
-            text = re.sub(r'[^a-zA-Z0-9_]', '_', text)
-            text = re.sub(r'_+', '_', text)  # Multiple underscores to single
-            text = text.strip('_')
-            if len(text) > 40:
-                text = text[:40]
-        
-        # Step 3: Clean up multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        
-        # Step 4: Ensure we return something valid
-        if not text or len(text) < 2:
-            return "item" if context == "label" else "check"
         
-        # Step 5: Remove any remaining problematic characters
-        # These can break PlantUML in subtle ways
-        problematic = ['@', '#', '$', '%', '^', '!', '?']
-        for char in problematic:
-            text = text.replace(char, '')
+        # Fast path: plain identifiers need no sanitization
+        if context == "label":
+            if _IDENT_RE.match(text):
+                return text
+        elif context == "filename":
+            if 2 <= len(text) <= 40 and _SAFE_FILENAME_RE.match(text):
+                return text
         
-        return text.strip()
+        return sanitize_cached(text, context)
     
-    def _validate_plantuml(self, plantuml_lines: List[str]) -> bool:
+    def _validate_plantuml(self, content: str) -> bool:
         """
         Validate PlantUML syntax before writing
         Returns True if valid, False otherwise
         """
-        content = '\n'.join(plantuml_lines)
-        
         # Check 1: Must have start and end tags
         if '@startuml' not in content or '@enduml' not in content:
             return False
@@ -160,91 +187,70 @@ class PlantUMLGenerator:
         
         console.print(f"[blue]Generating flow for: {func.name}[/blue]")
         
-        plantuml = ["@startuml"]
-        plantuml.append(f"title Function Flow - {self._ultra_sanitize(func.name, 'label')}")
-        plantuml.append("")
-        
-        # Styling
-        plantuml.extend([
-            "skinparam activity {",
-            "  BackgroundColor #B4E7CE",
-            "  BorderColor #2C5F2D",
-            "  FontSize 11",
-            "}",
-            "skinparam activityDiamond {",
-            "  BackgroundColor #FFD966",
-            "  BorderColor #CC9900",
-            "}",
-            "skinparam activityStart {",
-            "  BackgroundColor #4A90E2",
-            "}",
-            "skinparam activityEnd {",
-            "  BackgroundColor #E74C3C",
-            "}",
-            ""
-        ])
-        
-        plantuml.append("start")
-        plantuml.append("")
+        # Only the body varies; header, styling and footer come from the template
+        buf = io.StringIO()
+        w = buf.write
         
         # Function name
         func_label = self._ultra_sanitize(func.name, 'label')
-        plantuml.append(f":{func_label};")
+        w(f":{func_label};\n")
         
         # Add parameters info in note
         if func.parameters or func.return_type:
-            plantuml.append("note right")
+            w("note right\n")
             if func.return_type:
                 ret_type = self._ultra_sanitize(func.return_type, 'label')
-                plantuml.append(f"  Returns {ret_type}")
+                w(f"  Returns {ret_type}\n")
             if func.parameters:
-                plantuml.append(f"  {len(func.parameters)} parameter(s)")
-            plantuml.append("end note")
+                w(f"  {len(func.parameters)} parameter(s)\n")
+            w("end note\n")
         
-        plantuml.append("")
+        w("\n")
         
         # Add control flow with error handling
         if func.control_flow and len(func.control_flow) > 0:
             try:
-                self._add_flow_nodes(func.control_flow, plantuml, depth=0)
+                self._add_flow_nodes(func.control_flow, w, depth=0)
             except Exception as e:
                 console.print(f"[yellow]Warning: {e}[/yellow]")
-                plantuml.append(":execute function body;")
+                w(":execute function body;\n")
         else:
             # No control flow - show simple execution
             if func.calls and len(func.calls) > 0:
-                plantuml.append(":execute function body;")
-                for call in func.calls[:3]:
+                w(":execute function body;\n")
+                for call in islice(func.calls, 3):
                     safe_call = self._ultra_sanitize(call, 'label')
-                    plantuml.append(f":{safe_call};")
+                    w(f":{safe_call};\n")
             else:
-                plantuml.append(":execute function body;")
+                w(":execute function body;\n")
         
-        plantuml.append("")
-        plantuml.append("stop")
-        plantuml.append("")
-        plantuml.append("@enduml")
+        w("\n")
+        content = _ACTIVITY_TEMPLATE.format(
+            title=f"Function Flow - {func_label}",
+            styling=_FLOW_SKINPARAM,
+            body=buf.getvalue()
+        )
         
         # Validate before writing
-        if not self._validate_plantuml(plantuml):
+        if self.validate and not self._validate_plantuml(content):
             console.print("[red]PlantUML validation failed, using simplified version[/red]")
             # Fallback to ultra-simple diagram
-            plantuml = [
-                "@startuml",
-                f"title Function - {func_label}",
-                "",
-                "start",
-                f":{func_label};",
-                ":execute function;",
-                "stop",
-                "",
+            content = (
+                "@startuml\n"
+                f"title Function - {func_label}\n"
+                "\n"
+                "start\n"
+                f":{func_label};\n"
+                ":execute function;\n"
+                "stop\n"
+                "\n"
                 "@enduml"
-            ]
+            )
         
         # Write to file
         output_path = self.output_dir / f"{output_name}.puml"
         try:
-            output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+            self._write_puml(output_path, content)
             console.print(f"[green]✓ Saved: {output_path.name}[/green]")
         except Exception as e:
             console.print(f"[red]✗ Write error: {e}[/red]")
@@ -252,83 +258,115 @@ class PlantUMLGenerator:
         
         return str(output_path)
     
+    def generate_all_function_flows(self, funcs: List[Any]) -> List[str]:
+        """
+        Generate detailed flow diagrams for many functions
+        
+        Large batches are spread across CPU cores with a process pool;
+        small ones are generated in-process.
+        
+        Args:
+            funcs: List of FunctionInfo objects
+            
+        Returns:
+            Paths to generated PlantUML files, in the order of funcs
+        """
+        max_workers = self.config.get('max_workers')
+        if len(funcs) < _PARALLEL_FLOW_THRESHOLD or max_workers == 1:
+            return [self.generate_detailed_function_flow(func) for func in funcs]
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_flow_worker,
+            initargs=(self.config,)
+        ) as pool:
+            return list(pool.map(_worker_generate_flow, funcs, chunksize=16))
+    
     def _add_flow_nodes(
         self,
         nodes: List[Any],
-        plantuml: List[str],
+        w: Callable[[str], Any],
         depth: int = 0,
         max_depth: int = 4
     ) -> None:
         """Add control flow nodes with maximum safety"""
         if depth >= max_depth or not nodes:
             if depth >= max_depth:
-                plantuml.append(":... more code ...;")
+                w(":... more code ...;\n")
             return
         
         for node in nodes:
             try:
-                if node.type == 'if':
-                    condition = self._ultra_sanitize(node.condition or "condition", 'condition')
-                    plantuml.append(f"if ({condition}) then (yes)")
-                    
-                    if node.body_nodes:
-                        self._add_flow_nodes(node.body_nodes, plantuml, depth + 1, max_depth)
-                    else:
-                        plantuml.append("  :process;")
-                    
-                    if node.else_nodes:
-                        plantuml.append("else (no)")
-                        self._add_flow_nodes(node.else_nodes, plantuml, depth + 1, max_depth)
-                    
-                    plantuml.append("endif")
-                
-                elif node.type == 'for':
-                    condition = self._ultra_sanitize(node.condition or "loop", 'condition')
-                    plantuml.append("repeat")
-                    
-                    if node.body_nodes:
-                        self._add_flow_nodes(node.body_nodes, plantuml, depth + 1, max_depth)
-                    else:
-                        plantuml.append("  :loop body;")
-                    
-                    plantuml.append(f"repeat while ({condition})")
-                
-                elif node.type == 'while':
-                    condition = self._ultra_sanitize(node.condition or "condition", 'condition')
-                    plantuml.append(f"while ({condition}) is (true)")
-                    
-                    if node.body_nodes:
-                        self._add_flow_nodes(node.body_nodes, plantuml, depth + 1, max_depth)
-                    else:
-                        plantuml.append("  :loop body;")
-                    
-                    plantuml.append("endwhile (false)")
-                
-                elif node.type == 'switch':
-                    condition = self._ultra_sanitize(node.condition or "value", 'condition')
-                    plantuml.append(f"switch ({condition})")
-                    
-                    for case_node in (node.body_nodes or [])[:4]:
-                        if case_node.type == 'case':
-                            case_label = self._ultra_sanitize(case_node.label or "case", 'label')
-                            plantuml.append(f"case ({case_label})")
-                            
-                            if case_node.body_nodes:
-                                self._add_flow_nodes(case_node.body_nodes, plantuml, depth + 1, max_depth)
-                            else:
-                                plantuml.append("  :handle case;")
-                    
-                    plantuml.append("endswitch")
-                
-                elif node.type in ['return', 'call', 'statement']:
-                    label = self._ultra_sanitize(node.label or node.type, 'label')
-                    plantuml.append(f":{label};")
-                    
+                emit = self._node_emitters.get(node.type)
+                if emit:
+                    emit(node, w, depth, max_depth)
             except Exception as e:
                 console.print(f"[yellow]Skipping node due to error: {e}[/yellow]")
-                plantuml.append(":... code ...;")
+                w(":... code ...;\n")
                 continue
     
+    def _emit_if(self, node: Any, w: Callable[[str], Any], depth: int, max_depth: int) -> None:
+        """Emit an if/else block"""
+        condition = self._ultra_sanitize(node.condition or "condition", 'condition')
+        w(f"if ({condition}) then (yes)\n")
+        
+        if node.body_nodes:
+            self._add_flow_nodes(node.body_nodes, w, depth + 1, max_depth)
+        else:
+            w("  :process;\n")
+        
+        if node.else_nodes:
+            w("else (no)\n")
+            self._add_flow_nodes(node.else_nodes, w, depth + 1, max_depth)
+        
+        w("endif\n")
+    
+    def _emit_for(self, node: Any, w: Callable[[str], Any], depth: int, max_depth: int) -> None:
+        """Emit a for loop as repeat/repeat while"""
+        condition = self._ultra_sanitize(node.condition or "loop", 'condition')
+        w("repeat\n")
+        
+        if node.body_nodes:
+            self._add_flow_nodes(node.body_nodes, w, depth + 1, max_depth)
+        else:
+            w("  :loop body;\n")
+        
+        w(f"repeat while ({condition})\n")
+    
+    def _emit_while(self, node: Any, w: Callable[[str], Any], depth: int, max_depth: int) -> None:
+        """Emit a while loop"""
+        condition = self._ultra_sanitize(node.condition or "condition", 'condition')
+        w(f"while ({condition}) is (true)\n")
+        
+        if node.body_nodes:
+            self._add_flow_nodes(node.body_nodes, w, depth + 1, max_depth)
+        else:
+            w("  :loop body;\n")
+        
+        w("endwhile (false)\n")
+    
+    def _emit_switch(self, node: Any, w: Callable[[str], Any], depth: int, max_depth: int) -> None:
+        """Emit a switch with up to 4 cases"""
+        condition = self._ultra_sanitize(node.condition or "value", 'condition')
+        w(f"switch ({condition})\n")
+        
+        for case_node in islice(node.body_nodes or (), 4):
+            if case_node.type == 'case':
+                case_label = self._ultra_sanitize(case_node.label or "case", 'label')
+                w(f"case ({case_label})\n")
+                
+                if case_node.body_nodes:
+                    self._add_flow_nodes(case_node.body_nodes, w, depth + 1, max_depth)
+                else:
+                    w("  :handle case;\n")
+        
+        w("endswitch\n")
+    
+    def _emit_statement(self, node: Any, w: Callable[[str], Any], depth: int, max_depth: int) -> None:
+        """Emit a return, call or plain statement as a single activity"""
+        label = self._ultra_sanitize(node.label or node.type, 'label')
+        w(f":{label};\n")
+    
     def generate_function_call_graph(
         self,
         functions: List[Any],
@@ -340,60 +378,45 @@ class PlantUMLGenerator:
         
         func_dict = {f.name: f for f in functions}
         
-        plantuml = ["@startuml"]
-        plantuml.append("title Function Call Flow")
-        plantuml.append("")
-        
-        # Styling
-        plantuml.extend([
-            "skinparam activity {",
-            "  BackgroundColor #B4E7CE",
-            "  BorderColor #2C5F2D",
-            "}",
-            "skinparam activityDiamond {",
-            "  BackgroundColor #FFD966",
-            "  BorderColor #CC9900",
-            "}",
-            ""
-        ])
-        
-        plantuml.append("start")
-        plantuml.append("")
+        buf = io.StringIO()
+        w = buf.write
         
         if entry_point and entry_point in func_dict:
             func = func_dict[entry_point]
             func_label = self._ultra_sanitize(entry_point, 'label')
-            plantuml.append(f":{func_label};")
+            w(f":{func_label};\n")
             
             if func.control_flow:
                 try:
-                    self._add_flow_nodes(func.control_flow[:10], plantuml, depth=0, max_depth=3)
+                    self._add_flow_nodes(func.control_flow[:10], w, depth=0, max_depth=3)
                 except:
-                    for call in func.calls[:5]:
+                    for call in islice(func.calls, 5):
                         safe_call = self._ultra_sanitize(call, 'label')
-                        plantuml.append(f":{safe_call};")
+                        w(f":{safe_call};\n")
             else:
-                for call in func.calls[:5]:
+                for call in islice(func.calls, 5):
                     safe_call = self._ultra_sanitize(call, 'label')
-                    plantuml.append(f":{safe_call};")
+                    w(f":{safe_call};\n")
         else:
             # Show top 3 functions
-            for func in functions[:3]:
+            for func in islice(functions, 3):
                 func_label = self._ultra_sanitize(func.name, 'label')
-                plantuml.append(f":{func_label};")
+                w(f":{func_label};\n")
         
-        plantuml.append("")
-        plantuml.append("stop")
-        plantuml.append("")
-        plantuml.append("@enduml")
+        w("\n")
+        content = _ACTIVITY_TEMPLATE.format(
+            title="Function Call Flow",
+            styling=_CALL_GRAPH_SKINPARAM,
+            body=buf.getvalue()
+        )
         
         # Validate
-        if not self._validate_plantuml(plantuml):
+        if self.validate and not self._validate_plantuml(content):
             console.print("[yellow]Validation failed, using simplified diagram[/yellow]")
         
         # Write
         output_path = self.output_dir / f"{output_name}.puml"
-        output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+        self._write_puml(output_path, content)
         
         console.print(f"[green]✓ Saved: {output_path}[/green]")
         self._print_view_instructions(output_path)
@@ -403,33 +426,31 @@ class PlantUMLGenerator:
         """Generate class diagram"""
         console.print("[blue]Generating class diagram...[/blue]")
         
-        plantuml = ["@startuml", "title Class Diagram", ""]
-        plantuml.extend([
-            "skinparam class {",
-            "  BackgroundColor LightBlue",
-            "  BorderColor Navy",
-            "}",
-            ""
-        ])
+        buf = io.StringIO()
+        w = buf.write
         
-        for cls in classes[:20]:  # Limit to 20 classes
+        for cls in islice(classes, 20):  # Limit to 20 classes
             safe_name = self._ultra_sanitize(cls.name, 'filename')
-            plantuml.append(f"class {safe_name} {{")
+            w(f"class {safe_name} {{\n")
             
-            for method in cls.methods[:10]:
+            for method in islice(cls.methods, 10):
                 method_name = self._ultra_sanitize(method.name, 'label')
-                plantuml.append(f"  +{method_name}()")
+                w(f"  +{method_name}()\n")
             
             if len(cls.methods) > 10:
-                plantuml.append(f"  ... {len(cls.methods) - 10} more ...")
+                w(f"  ... {len(cls.methods) - 10} more ...\n")
             
-            plantuml.append("}")
-            plantuml.append("")
+            w("}\n")
+            w("\n")
         
-        plantuml.extend(["", "@enduml"])
+        content = _CLASS_TEMPLATE.format(
+            title="Class Diagram",
+            styling=_CLASS_SKINPARAM,
+            body=buf.getvalue()
+        )
         
         output_path = self.output_dir / f"{output_name}.puml"
-        output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+        self._write_puml(output_path, content)
         
         console.print(f"[green]✓ Saved: {output_path}[/green]")
         self._print_view_instructions(output_path)
@@ -439,47 +460,39 @@ class PlantUMLGenerator:
         """Generate module structure"""
         console.print("[blue]Generating module structure...[/blue]")
         
-        plantuml = ["@startuml", "title Module Structure", ""]
-        plantuml.extend([
-            "skinparam activity {",
-            "  BackgroundColor #E8F4F8",
-            "  BorderColor #4A90E2",
-            "}",
-            ""
-        ])
-        
-        plantuml.append("start")
-        plantuml.append("")
-        
-        dir_files: Dict[str, List[str]] = {}
-        for file_path in list(files_info.keys())[:50]:  # Limit files
-            dir_name = str(Path(file_path).parent)
-            if dir_name not in dir_files:
-                dir_files[dir_name] = []
-            dir_files[dir_name].append(file_path)
-        
-        for dir_name, files in list(dir_files.items())[:10]:  # Limit directories
-            package_name = Path(dir_name).name or "root"
+        buf = io.StringIO()
+        w = buf.write
+        
+        # Parse each path once; group file names by parent directory
+        dir_files: Dict[Path, List[str]] = defaultdict(list)
+        for file_path in islice(files_info, 50):  # Limit files
+            path = Path(file_path)
+            dir_files[path.parent].append(path.name)
+        
+        for dir_path, files in islice(dir_files.items(), 10):  # Limit directories
+            package_name = dir_path.name or "root"
             safe_package = self._ultra_sanitize(package_name, 'label')
             
-            plantuml.append(f"partition \"{safe_package}\" {{")
+            w(f"partition \"{safe_package}\" {{\n")
             
-            for file_path in files[:5]:  # Limit files per dir
-                file_name = Path(file_path).name
+            for file_name in islice(files, 5):  # Limit files per dir
                 safe_file = self._ultra_sanitize(file_name, 'label')
-                plantuml.append(f"  :{safe_file};")
+                w(f"  :{safe_file};\n")
             
             if len(files) > 5:
-                plantuml.append(f"  note right: {len(files) - 5} more files")
+                w(f"  note right: {len(files) - 5} more files\n")
             
-            plantuml.append("}")
-            plantuml.append("")
+            w("}\n")
+            w("\n")
         
-        plantuml.append("stop")
-        plantuml.extend(["", "@enduml"])
+        content = _ACTIVITY_TEMPLATE.format(
+            title="Module Structure",
+            styling=_MODULE_SKINPARAM,
+            body=buf.getvalue()
+        )
         
         output_path = self.output_dir / f"{output_name}.puml"
-        output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+        self._write_puml(output_path, content)
         
         console.print(f"[green]✓ Saved: {output_path}[/green]")
         self._print_view_instructions(output_path)
@@ -487,13 +500,19 @@ class PlantUMLGenerator:
     
     def generate_summary_stats(self, functions: List[Any], classes: List[Any]) -> Dict[str, Any]:
         """Generate summary statistics"""
+        total_methods = sum(len(c.methods) for c in classes)
         return {
             'total_functions': len(functions),
             'total_classes': len(classes),
-            'total_methods': sum(len(c.methods) for c in classes),
-            'avg_methods_per_class': sum(len(c.methods) for c in classes) / len(classes) if classes else 0,
+            'total_methods': total_methods,
+            'avg_methods_per_class': total_methods / len(classes) if classes else 0,
         }
     
+    def _write_puml(self, path: Path, content: str) -> None:
+        """Write PlantUML content as UTF-8 through a single large buffered stream"""
+        with open(path, 'wb', buffering=262144) as f:
+            f.write(content.encode('utf-8'))
+    
     def _print_view_instructions(self, file_path: Path) -> None:
         """Print viewing instructions"""
         console.print("\n[cyan]To view:[/cyan]")
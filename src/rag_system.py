@@ -57,17 +57,21 @@ class RAGSystem:
         """
         console.print(f"[blue]Creating vector store with {len(code_chunks)} chunks...[/blue]")
         
-        # Convert to LangChain documents
-        documents = []
+        # Convert to LangChain documents, splitting only oversized chunks;
+        # for text within chunk_size the splitter would just strip it
+        chunk_size = self.vectordb_config['chunk_size']
+        split_docs = []
         for chunk in code_chunks:
-            doc = Document(
-                page_content=chunk['content'],
-                metadata=chunk['metadata']
-            )
-            documents.append(doc)
+            content = chunk['content']
+            if len(content) > chunk_size:
+                doc = Document(page_content=content, metadata=chunk['metadata'])
+                split_docs.extend(self.text_splitter.split_documents([doc]))
+                continue
+            
+            content = content.strip()
+            if content:
+                split_docs.append(Document(page_content=content, metadata=chunk['metadata']))
         
-        # Split documents if needed
-        split_docs = self.text_splitter.split_documents(documents)
         console.print(f"[blue]Split into {len(split_docs)} document chunks[/blue]")
         
         # Create persist directory
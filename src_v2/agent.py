@@ -2,15 +2,17 @@
 Main Agent - Clean Implementation
 """
 
+from dataclasses import replace
 from typing import Optional, Dict, Any, List
 from pathlib import Path
+import os
+import sys
 try:
     from langchain_ollama import ChatOllama
 except ImportError:
     from langchain_community.chat_models import ChatOllama
-from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -21,6 +23,9 @@ from .diagram_generator import DiagramGenerator
 
 console = Console()
 
+# Above this many rows list_functions prints plain text instead of a Rich table
+_PLAIN_LIST_THRESHOLD = 100
+
 
 class CPPAnalysisAgent:
     """AI Agent for analyzing C++ projects"""
@@ -40,6 +45,9 @@ class CPPAnalysisAgent:
         self.rag_system = RAGSystem(config)
         self.diagram_generator = DiagramGenerator(config.get('flowchart', {}))
         
+        # Functions diagrammed when no name is given; 0 means all of them
+        self.max_flows = config.get('flowchart', {}).get('max_flows', 20)
+        
         # Initialize LLM
         ollama_config = config.get('ollama', {})
         self.llm = ChatOllama(
@@ -90,7 +98,7 @@ class CPPAnalysisAgent:
                 # Generate for specific function
                 funcs = [f for f in self.parser.get_functions() if f.name == function_name]
                 if funcs:
-                    func = funcs[0]
+                    func = replace(funcs[0], body_node=self.parser.get_body_node(funcs[0]))
                     content = self.parser.files_content.get(func.file_path, "")
                     path = self.diagram_generator.generate_function_flow(func, content)
                     output_paths.append(path)
@@ -98,15 +106,11 @@ class CPPAnalysisAgent:
                     console.print(f"[red]Function '{function_name}' not found[/red]")
             else:
                 # Generate for all functions with bodies
-                funcs = [f for f in self.parser.get_functions() if f.body_node]
+                funcs = [f for f in self.parser.get_functions() if f.body_range]
+                if self.max_flows:
+                    funcs = funcs[:self.max_flows]
                 console.print(f"[blue]Generating flows for {len(funcs)} functions...[/blue]")
-                for func in funcs[:20]:  # Limit to 20
-                    try:
-                        content = self.parser.files_content.get(func.file_path, "")
-                        path = self.diagram_generator.generate_function_flow(func, content)
-                        output_paths.append(path)
-                    except Exception as e:
-                        console.print(f"[yellow]Warning: {func.name}: {e}[/yellow]")
+                output_paths.extend(self.diagram_generator.generate_function_flows(funcs, self.parser))
         
         elif diagram_type == "module":
             chunks = self.parser.get_ast_chunks()
@@ -138,14 +142,22 @@ class CPPAnalysisAgent:
         """List all functions"""
         funcs = self.parser.get_functions()
         
+        if limit > _PLAIN_LIST_THRESHOLD:
+            self._print_functions_fast(funcs[:limit])
+            return
+        
         table = Table(title="Functions")
         table.add_column("Name", style="cyan")
         table.add_column("Return", style="green")
         table.add_column("File", style="blue")
         table.add_column("Line", style="yellow")
         
+        # Many functions share a file; compute each short name once
+        file_names: Dict[str, str] = {}
         for func in funcs[:limit]:
-            file_name = Path(func.file_path).name
+            file_name = file_names.get(func.file_path)
+            if file_name is None:
+                file_name = file_names[func.file_path] = os.path.basename(func.file_path)
             table.add_row(
                 func.name,
                 func.return_type,
@@ -155,6 +167,26 @@ class CPPAnalysisAgent:
         
         console.print(table)
     
+    def _print_functions_fast(self, funcs: List[Any]) -> None:
+        """Print functions as aligned plain text in a single write"""
+        file_names: Dict[str, str] = {}
+        rows = [("Name", "Return", "File", "Line")]
+        for func in funcs:
+            file_name = file_names.get(func.file_path)
+            if file_name is None:
+                file_name = file_names[func.file_path] = os.path.basename(func.file_path)
+            rows.append((func.name, func.return_type, file_name, str(func.line_number)))
+        
+        # Columns as wide as their longest value, so none shifts the next
+        name_w, return_w, file_w, line_w = (max(map(len, column)) for column in zip(*rows))
+        lines = [
+            "%-*s %-*s %-*s %*s\n" % (name_w, name, return_w, ret, file_w, file_name, line_w, line)
+            for name, ret, file_name, line in rows
+        ]
+        
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+    
     def _setup_qa_chain(self) -> None:
         """Setup QA chain"""
         prompt_template = """You are an expert C++ code analyst. Use the following code context to answer the question.
@@ -168,10 +200,9 @@ Provide a detailed and technical answer based on the code context.
 
 Answer:"""
         
-        PROMPT = PromptTemplate(
-            template=prompt_template,
-            input_variables=["context", "question"]
-        )
+        # Plain str.format instead of PromptTemplate: no per-query input
+        # validation or PromptValue; the LLM takes the string as one message
+        render_prompt = prompt_template.format
         
         def format_docs(docs):
             return "\n\n".join(doc.page_content for doc in docs)
@@ -183,7 +214,7 @@ Answer:"""
                 "context": retriever | format_docs,
                 "question": RunnablePassthrough()
             }
-            | PROMPT
+            | RunnableLambda(lambda inputs: render_prompt(**inputs))
             | self.llm
             | StrOutputParser()
         )
@@ -4,35 +4,51 @@ Uses tree-sitter to parse C++ and extract semantic units
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+import stat
 import tree_sitter_cpp as tscpp
 from tree_sitter import Language, Parser, Node
+try:
+    from tree_sitter import Query, QueryCursor
+except ImportError:  # tree-sitter < 0.25
+    Query = QueryCursor = None
 from rich.console import Console
 
 console = Console()
 
 
-@dataclass
+@dataclass(slots=True)
 class ASTChunk:
     """Represents a semantic chunk from AST"""
     chunk_type: str  # 'function', 'class', 'namespace'
     name: str
-    content: str  # Full source code
+    source: str = field(repr=False)  # Whole file text, shared with files_content
+    span: Tuple[int, int]  # Character offsets of the chunk in source
     ast_node: Any  # tree-sitter Node reference
     file_path: str
     line_start: int
     line_end: int
     metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def content(self) -> str:
+        """Full source code, sliced on access"""
+        start, end = self.span
+        return self.source[start:end]
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionAST:
     """Function extracted from AST"""
     name: str
     return_type: str
     parameters: List[str]
     body_node: Optional[Node] = None
+    body_range: Optional[Tuple[int, int]] = None  # Byte offsets of the body
     file_path: str = ""
     line_number: int = 0
     namespace: str = ""
@@ -40,7 +56,7 @@ class FunctionAST:
     is_method: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassAST:
     """Class extracted from AST"""
     name: str
@@ -51,6 +67,129 @@ class ClassAST:
     namespace: str = ""
 
 
+def _node_text(source: bytes, node: Node) -> str:
+    """Source text of a node (tree-sitter offsets are byte offsets)"""
+    return source[node.start_byte:node.end_byte].decode('utf8')
+
+
+# Files at least this large are mapped instead of read into a bytes copy
+_MMAP_MIN_SIZE = 64 * 1024
+
+
+class _CharSpans:
+    """
+    Character offsets in text of nodes located by byte offsets in source
+    
+    Nodes must come in increasing start order (as _captures returns them):
+    a (byte, char) cursor is advanced past the bytes between them, so each
+    byte of a file is decoded once rather than once per chunk.
+    """
+    
+    def __init__(self, source: bytes, text: str):
+        self.source = source
+        # ASCII: bytes and characters line up
+        self.ascii = len(source) == len(text)
+        self.byte = 0
+        self.char = 0
+    
+    def __call__(self, node: Node) -> Tuple[int, int]:
+        start_byte, end_byte = node.start_byte, node.end_byte
+        if self.ascii:
+            return start_byte, end_byte
+        self.char += len(self.source[self.byte:start_byte].decode('utf8'))
+        self.byte = start_byte
+        return self.char, self.char + len(self.source[start_byte:end_byte].decode('utf8'))
+
+
+def _read_source(file_path: Path) -> Tuple[Any, str]:
+    """
+    Read a file as UTF-8 source bytes plus decoded text
+    
+    Matches text-mode reading (universal newlines, undecodable bytes
+    dropped) while letting clean files be parsed straight from the bytes
+    read, or from an mmap for large files, without re-encoding.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_MIN_SIZE:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            source = f.read()
+    
+    try:
+        content = str(source, 'utf-8')
+        clean = True
+    except UnicodeDecodeError:
+        content = str(source, 'utf-8', 'ignore')
+        clean = False
+    
+    # Universal newlines, as open(..., 'r') would give
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        clean = False
+    
+    if not clean:
+        source = content.encode('utf8')
+    return source, content
+
+
+# Every semantic unit _extract_from_ast cares about, matched in one C-side pass
+_EXTRACT_QUERY = """
+(function_definition) @function
+(class_specifier) @class
+(struct_specifier) @class
+(namespace_definition) @namespace
+"""
+
+# Node types tested while extracting functions and classes
+_RETURN_TYPE_NODES = frozenset({'primitive_type', 'type_identifier', 'qualified_identifier'})
+_CLASS_NODES = frozenset({'class_specifier', 'struct_specifier'})
+_BASE_CLASS_NODES = frozenset({'type_identifier', 'qualified_identifier'})
+
+# Projects with fewer files are parsed in-process; pool startup costs more
+_PARALLEL_PARSE_THRESHOLD = 32
+
+# Re-parsed trees get_body_node keeps, most recently used last
+_TREE_CACHE_SIZE = 8
+
+# Per-process parser used by parse_project workers
+_worker_parser: Optional['ASTParser'] = None
+
+
+def _init_parse_worker(config: Dict[str, Any]) -> None:
+    """Create the parser once in each worker process"""
+    global _worker_parser
+    _worker_parser = ASTParser(config)
+
+
+def _worker_parse_file(file_path: Path) -> Tuple[Optional[str], List[FunctionAST], List[ClassAST], List[ASTChunk], Optional[str]]:
+    """
+    Parse one file inside a worker process
+    
+    tree-sitter nodes cannot be pickled, so they are dropped before the
+    results travel back; bodies stay reachable through body_range.
+    
+    Returns:
+        (content, functions, classes, chunks, error message)
+    """
+    parser = _worker_parser
+    parser.functions, parser.classes, parser.chunks, parser.files_content = [], [], [], {}
+    try:
+        parser._parse_file(file_path)
+    except Exception as e:
+        return None, [], [], [], str(e)
+    
+    for func in parser.functions:
+        func.body_node = None
+    for cls in parser.classes:
+        for method in cls.methods:
+            method.body_node = None
+    for chunk in parser.chunks:
+        chunk.ast_node = None
+    
+    content = parser.files_content.get(str(file_path))
+    return content, parser.functions, parser.classes, parser.chunks, None
+
+
 class ASTParser:
     """Parse C++ code using tree-sitter AST"""
     
@@ -64,12 +203,23 @@ class ASTParser:
         self.parser = Parser()
         self.language = Language(tscpp.language())
         self.parser.language = self.language
+        if Query is not None:
+            self.query = Query(self.language, _EXTRACT_QUERY)
+        else:
+            self.query = self.language.query(_EXTRACT_QUERY)
         
         # Storage
         self.functions: List[FunctionAST] = []
         self.classes: List[ClassAST] = []
         self.chunks: List[ASTChunk] = []
         self.files_content: Dict[str, str] = {}
+        
+        # Trees re-parsed on demand for functions parsed in worker processes,
+        # bounded to the last _TREE_CACHE_SIZE files used
+        self._trees: Dict[str, Any] = {}
+        
+        # First child of each type, keyed by node id; valid for one file
+        self._kids: Dict[int, Dict[str, Node]] = {}
     
     def parse_project(self, project_path: str) -> None:
         """Parse entire C++ project"""
@@ -80,152 +230,207 @@ class ASTParser:
         cpp_files = self._find_cpp_files(project_path)
         console.print(f"[blue]Found {len(cpp_files)} C++ files[/blue]")
         
-        for file_path in cpp_files:
-            try:
-                self._parse_file(file_path)
-            except Exception as e:
-                console.print(f"[yellow]Warning: Error parsing {file_path}: {e}[/yellow]")
+        max_workers = self.config.get('max_workers')
+        if len(cpp_files) < _PARALLEL_PARSE_THRESHOLD or max_workers == 1:
+            for file_path in cpp_files:
+                try:
+                    self._parse_file(file_path)
+                except Exception as e:
+                    console.print(f"[yellow]Warning: Error parsing {file_path}: {e}[/yellow]")
+        else:
+            # Files are independent; spread them across CPU cores
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_parse_worker,
+                initargs=(self.config,)
+            ) as pool:
+                results = pool.map(_worker_parse_file, cpp_files, chunksize=8)
+                for file_path, (content, functions, classes, chunks, error) in zip(cpp_files, results):
+                    if error is not None:
+                        console.print(f"[yellow]Warning: Error parsing {file_path}: {error}[/yellow]")
+                        continue
+                    if content is not None:
+                        self.files_content[str(file_path)] = content
+                    self.functions.extend(functions)
+                    self.classes.extend(classes)
+                    self.chunks.extend(chunks)
         
         console.print(f"[green]✓ Parsed {len(self.functions)} functions, {len(self.classes)} classes[/green]")
     
     def _find_cpp_files(self, root_path: Path) -> List[Path]:
         """Find all C++ files"""
+        ignore = set(self.ignore_dirs)
+        extensions = set(self.file_extensions)
+        max_size = self.max_file_size_mb * 1024 * 1024
+        
         cpp_files = []
-        for file_path in root_path.rglob('*'):
-            if any(ignored in file_path.parts for ignored in self.ignore_dirs):
-                continue
-            if file_path.suffix in self.file_extensions and file_path.is_file():
-                size_mb = file_path.stat().st_size / (1024 * 1024)
-                if size_mb <= self.max_file_size_mb:
-                    cpp_files.append(file_path)
+        for dir_path, dir_names, file_names in os.walk(root_path):
+            # Prune ignored directories so they are never descended into
+            dir_names[:] = [d for d in dir_names if d not in ignore]
+            for file_name in file_names:
+                if os.path.splitext(file_name)[1] not in extensions:
+                    continue
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and st.st_size <= max_size:
+                    cpp_files.append(Path(file_path))
         return cpp_files
     
     def _parse_file(self, file_path: Path) -> None:
         """Parse a single C++ file"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            source, content = _read_source(file_path)
         except Exception as e:
             console.print(f"[red]Error reading {file_path}: {e}[/red]")
             return
         
         self.files_content[str(file_path)] = content
         
-        # Parse AST
-        tree = self.parser.parse(bytes(content, 'utf8'))
+        # Parse AST; node offsets index these bytes, not the str
+        tree = self.parser.parse(source)
         root_node = tree.root_node
         
         # Extract semantic units
-        self._extract_from_ast(root_node, content, str(file_path), "")
+        self._extract_from_ast(root_node, source, str(file_path))
     
-    def _extract_from_ast(self, node: Node, content: str, file_path: str, namespace: str) -> None:
-        """Recursively extract functions and classes from AST"""
-        if node.type == 'function_definition':
-            func = self._parse_function(node, content, file_path, namespace)
-            if func:
-                self.functions.append(func)
-                # Create chunk
-                chunk = ASTChunk(
-                    chunk_type='function',
-                    name=func.name,
-                    content=content[node.start_byte:node.end_byte],
-                    ast_node=node,
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    metadata={
-                        'return_type': func.return_type,
-                        'parameters': func.parameters,
-                        'namespace': func.namespace,
-                        'class_name': func.class_name,
-                        'is_method': func.is_method
-                    }
-                )
-                self.chunks.append(chunk)
+    def _captures(self, root_node: Node) -> List[Node]:
+        """Nodes matched by the extraction query, in document (pre-)order"""
+        if QueryCursor is not None:
+            captures = QueryCursor(self.query).captures(root_node)
+        else:
+            captures = self.query.captures(root_node)
         
-        elif node.type in ['class_specifier', 'struct_specifier']:
-            cls = self._parse_class(node, content, file_path, namespace)
-            if cls:
-                self.classes.append(cls)
-                # Create chunk
-                chunk = ASTChunk(
-                    chunk_type='class',
-                    name=cls.name,
-                    content=content[node.start_byte:node.end_byte],
-                    ast_node=node,
-                    file_path=file_path,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    metadata={
-                        'base_classes': cls.base_classes,
-                        'namespace': cls.namespace,
-                        'method_count': len(cls.methods)
-                    }
-                )
-                self.chunks.append(chunk)
+        # dict of name -> nodes (0.23+) or list of (node, name) (older)
+        if isinstance(captures, dict):
+            nodes = [node for group in captures.values() for node in group]
+        else:
+            nodes = [node for node, _ in captures]
         
-        elif node.type == 'namespace_definition':
-            # Extract namespace name and recurse
-            name_node = self._find_child(node, 'namespace')
-            if name_node and name_node.next_sibling:
-                ns_name = content[name_node.next_sibling.start_byte:name_node.next_sibling.end_byte]
-                new_namespace = f"{namespace}::{ns_name}" if namespace else ns_name
-            else:
-                new_namespace = namespace
+        # Outer nodes first when two start at the same byte
+        nodes.sort(key=lambda n: (n.start_byte, -n.end_byte))
+        return nodes
+    
+    def _extract_from_ast(self, root_node: Node, source: bytes, file_path: str) -> None:
+        """Extract functions and classes from AST"""
+        # Enclosing namespaces as (end byte, qualified name)
+        ns_stack: List[Tuple[int, str]] = []
+        
+        # Node ids are only unique within one tree
+        self._kids.clear()
+        
+        # Chunks reference the file text rather than copying their slice
+        text = self.files_content[file_path]
+        char_span = _CharSpans(source, text)
+        
+        for node in self._captures(root_node):
+            while ns_stack and node.start_byte >= ns_stack[-1][0]:
+                ns_stack.pop()
+            namespace = ns_stack[-1][1] if ns_stack else ""
             
-            # Recurse into namespace body
-            body = self._find_child(node, 'declaration_list') or self._find_child(node, 'compound_statement')
-            if body:
-                for child in body.children:
-                    self._extract_from_ast(child, content, file_path, new_namespace)
-            return
+            if node.type == 'function_definition':
+                func = self._parse_function(node, source, file_path, namespace)
+                if func:
+                    self.functions.append(func)
+                    # Create chunk
+                    chunk = ASTChunk(
+                        chunk_type='function',
+                        name=func.name,
+                        source=text,
+                        span=char_span(node),
+                        ast_node=node,
+                        file_path=file_path,
+                        line_start=node.start_point[0] + 1,
+                        line_end=node.end_point[0] + 1,
+                        metadata={
+                            'return_type': func.return_type,
+                            'parameters': func.parameters,
+                            'namespace': func.namespace,
+                            'class_name': func.class_name,
+                            'is_method': func.is_method
+                        }
+                    )
+                    self.chunks.append(chunk)
+            
+            elif node.type == 'namespace_definition':
+                # Extract namespace name for everything in its body
+                name_node = self._children_by_type(node).get('namespace')
+                if name_node and name_node.next_sibling:
+                    ns_name = _node_text(source, name_node.next_sibling)
+                    namespace = f"{namespace}::{ns_name}" if namespace else ns_name
+                ns_stack.append((node.end_byte, namespace))
+            
+            else:
+                cls = self._parse_class(node, source, file_path, namespace)
+                if cls:
+                    self.classes.append(cls)
+                    # Create chunk
+                    chunk = ASTChunk(
+                        chunk_type='class',
+                        name=cls.name,
+                        source=text,
+                        span=char_span(node),
+                        ast_node=node,
+                        file_path=file_path,
+                        line_start=node.start_point[0] + 1,
+                        line_end=node.end_point[0] + 1,
+                        metadata={
+                            'base_classes': cls.base_classes,
+                            'namespace': cls.namespace,
+                            'method_count': len(cls.methods)
+                        }
+                    )
+                    self.chunks.append(chunk)
         
-        # Recurse into children
-        for child in node.children:
-            self._extract_from_ast(child, content, file_path, namespace)
+        self._kids.clear()
     
-    def _parse_function(self, node: Node, content: str, file_path: str, namespace: str) -> Optional[FunctionAST]:
+    def _parse_function(self, node: Node, source: bytes, file_path: str, namespace: str) -> Optional[FunctionAST]:
         """Parse function from AST node"""
         try:
             # Get function declarator
-            declarator = self._find_child(node, 'function_declarator')
+            kids = self._children_by_type(node)
+            declarator = kids.get('function_declarator')
             if not declarator:
                 return None
             
             # Get function name
-            identifier = self._find_child(declarator, 'identifier') or self._find_child(declarator, 'field_identifier')
+            declarator_kids = self._children_by_type(declarator)
+            identifier = declarator_kids.get('identifier') or declarator_kids.get('field_identifier')
             if not identifier:
                 return None
             
-            name = content[identifier.start_byte:identifier.end_byte]
+            name = _node_text(source, identifier)
             
             # Get return type
             return_type = "void"
             for child in node.children:
-                if child.type in ['primitive_type', 'type_identifier', 'qualified_identifier']:
-                    return_type = content[child.start_byte:child.end_byte]
+                if child.type in _RETURN_TYPE_NODES:
+                    return_type = _node_text(source, child)
                     break
             
             # Get parameters
             params = []
-            param_list = self._find_child(declarator, 'parameter_list')
+            param_list = declarator_kids.get('parameter_list')
             if param_list:
                 for child in param_list.children:
                     if child.type == 'parameter_declaration':
-                        params.append(content[child.start_byte:child.end_byte])
+                        params.append(_node_text(source, child))
             
             # Get body
-            body_node = self._find_child(node, 'compound_statement')
+            body_node = kids.get('compound_statement')
+            body_range = (body_node.start_byte, body_node.end_byte) if body_node else None
             
             # Check if it's a method (inside a class)
             class_name = ""
             is_method = False
             parent = node.parent
             while parent:
-                if parent.type in ['class_specifier', 'struct_specifier']:
-                    class_node = self._find_child(parent, 'type_identifier')
+                if parent.type in _CLASS_NODES:
+                    class_node = self._children_by_type(parent).get('type_identifier')
                     if class_node:
-                        class_name = content[class_node.start_byte:class_node.end_byte]
+                        class_name = _node_text(source, class_node)
                         is_method = True
                     break
                 parent = parent.parent
@@ -235,6 +440,7 @@ class ASTParser:
                 return_type=return_type,
                 parameters=params,
                 body_node=body_node,
+                body_range=body_range,
                 file_path=file_path,
                 line_number=node.start_point[0] + 1,
                 namespace=namespace,
@@ -244,30 +450,31 @@ class ASTParser:
         except Exception:
             return None
     
-    def _parse_class(self, node: Node, content: str, file_path: str, namespace: str) -> Optional[ClassAST]:
+    def _parse_class(self, node: Node, source: bytes, file_path: str, namespace: str) -> Optional[ClassAST]:
         """Parse class from AST node"""
         try:
-            name_node = self._find_child(node, 'type_identifier')
+            kids = self._children_by_type(node)
+            name_node = kids.get('type_identifier')
             if not name_node:
                 return None
             
-            name = content[name_node.start_byte:name_node.end_byte]
+            name = _node_text(source, name_node)
             
             # Get base classes
             base_classes = []
-            base_clause = self._find_child(node, 'base_class_clause')
+            base_clause = kids.get('base_class_clause')
             if base_clause:
                 for child in base_clause.children:
-                    if child.type in ['type_identifier', 'qualified_identifier']:
-                        base_classes.append(content[child.start_byte:child.end_byte])
+                    if child.type in _BASE_CLASS_NODES:
+                        base_classes.append(_node_text(source, child))
             
             # Get methods
             methods = []
-            body = self._find_child(node, 'field_declaration_list')
+            body = kids.get('field_declaration_list')
             if body:
                 for child in body.children:
                     if child.type == 'function_definition':
-                        method = self._parse_function(child, content, file_path, namespace)
+                        method = self._parse_function(child, source, file_path, namespace)
                         if method:
                             method.class_name = name
                             method.is_method = True
@@ -284,12 +491,52 @@ class ASTParser:
         except Exception:
             return None
     
-    def _find_child(self, node: Node, type_name: str) -> Optional[Node]:
-        """Find first child with given type"""
-        for child in node.children:
-            if child.type == type_name:
-                return child
-        return None
+    def load_source(self, file_path: str, content: str) -> None:
+        """
+        Make content the only known file text, dropping trees of earlier files
+        (flow workers receive one file's text per task)
+        """
+        self.files_content = {file_path: content}
+        self._trees.clear()
+    
+    def get_body_node(self, func: FunctionAST) -> Optional[Node]:
+        """
+        Body node of a function, re-parsing its file if the node was dropped
+        (functions parsed in worker processes only carry body_range)
+        
+        A re-located node is returned but not stored on func: nodes keep
+        their tree alive, which would defeat the bound on cached trees.
+        """
+        if func.body_node is None and func.body_range:
+            # Popped and re-inserted so the dict stays in least-recent-first order
+            tree = self._trees.pop(func.file_path, None)
+            if tree is None:
+                content = self.files_content.get(func.file_path)
+                if content is None:
+                    return None
+                tree = self.parser.parse(bytes(content, 'utf8'))
+                if len(self._trees) >= _TREE_CACHE_SIZE:
+                    del self._trees[next(iter(self._trees))]
+            self._trees[func.file_path] = tree
+            
+            start, end = func.body_range
+            node = tree.root_node.descendant_for_byte_range(start, end)
+            while node is not None and not (
+                node.type == 'compound_statement' and node.start_byte == start and node.end_byte == end
+            ):
+                node = node.parent
+            return node
+        return func.body_node
+    
+    def _children_by_type(self, node: Node) -> Dict[str, Node]:
+        """First child of each type, built once per node while a file is extracted"""
+        kids = self._kids.get(node.id)
+        if kids is None:
+            kids = {}
+            for child in node.children:
+                kids.setdefault(child.type, child)
+            self._kids[node.id] = kids
+        return kids
     
     def get_ast_chunks(self) -> List[ASTChunk]:
         """Get all AST-based chunks for RAG"""
@@ -2,10 +2,25 @@
 Configuration Loader
 """
 
+import copy
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 
+# libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+@lru_cache(maxsize=8)
+def _load(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML file once per (path, modification time)"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
 
 class ConfigLoader:
     """Load configuration from YAML file"""
@@ -19,8 +34,9 @@ class ConfigLoader:
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
-        with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+        # Copy so callers can't modify the cached parse
+        mtime = self.config_path.stat().st_mtime
+        return copy.deepcopy(_load(str(self.config_path.resolve()), mtime))
     
     def get_config(self) -> Dict[str, Any]:
         """Get full configuration"""
@@ -3,22 +3,163 @@ PlantUML Diagram Generator - AST-Based
 Generates diagrams directly from AST structure
 """
 
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Tuple
 from rich.console import Console
-from .ast_parser import FunctionAST, ClassAST, ASTChunk
+from .ast_parser import ASTParser, FunctionAST, ClassAST, ASTChunk
 
 console = Console()
 
+# Pending traversal work for _ast_to_plantuml: (node, depth, line to emit)
+_WorkStack = List[Tuple[Any, int, Optional[str]]]
+
+# Smaller batches of flows are generated in-process; pool startup costs more
+_PARALLEL_FLOW_THRESHOLD = 32
+
+# Function bodies whose PlantUML lines each generator keeps
+_FLOW_CACHE_SIZE = 1024
+
+# Per-process generator and parser used by generate_function_flows workers
+_worker_state: Optional[Tuple['DiagramGenerator', ASTParser]] = None
+
+
+def _init_flow_worker(config: Dict[str, Any], parser_config: Dict[str, Any]) -> None:
+    """Create the generator and parser once in each worker process"""
+    global _worker_state
+    _worker_state = (DiagramGenerator(config), ASTParser(parser_config))
+
+
+def _worker_flow_file(task: Tuple[str, str, List[FunctionAST]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Generate the flows of one file's functions inside a worker process
+    
+    tree-sitter nodes cannot be pickled, so the file is re-parsed here and
+    bodies are located through body_range.
+    
+    Returns:
+        (output path, error message) per function
+    """
+    generator, parser = _worker_state
+    file_path, content, funcs = task
+    parser.load_source(file_path, content)
+    
+    results = []
+    for func in funcs:
+        try:
+            func = replace(func, body_node=parser.get_body_node(func))
+            results.append((generator.generate_function_flow(func, content), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+# Node types tested in the traversal helpers
+_BRACE_TYPES = frozenset({'{', '}'})
+_CASE_TYPES = frozenset({'case', 'default'})
+
+_SAFE_NAME_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+# One translate pass instead of chained str.replace calls
+_LABEL_TRANS = str.maketrans({':': ' ', ';': None})
+_COND_TRANS = str.maketrans({':': ' ', ';': None, '|': ' or ', '[': '(', ']': ')'})
+
+
+def _write_lines(path: Path, lines: List[str]) -> None:
+    """Write lines separated by newlines without joining them into one string"""
+    with path.open('w', encoding='utf-8', buffering=64 * 1024) as f:
+        it = iter(lines)
+        f.write(next(it, ""))
+        for line in it:
+            f.write("\n")
+            f.write(line)
+
+
+@lru_cache(maxsize=1024)
+def _label_text(text: str) -> str:
+    """Cached core of DiagramGenerator._safe_label"""
+    if not text:
+        return "item"
+    # Remove colons and semicolons
+    text = (text if isinstance(text, str) else str(text)).translate(_LABEL_TRANS).strip()
+    # Limit length
+    if len(text) > 50:
+        text = text[:47] + "..."
+    return text or "item"
+
+
+@lru_cache(maxsize=1024)
+def _condition_text(text: str) -> str:
+    """Cached core of DiagramGenerator._safe_condition"""
+    if not text:
+        return "check"
+    # More aggressive sanitization for conditions
+    text = (text if isinstance(text, str) else str(text)).translate(_COND_TRANS).strip()
+    if len(text) > 40:
+        text = text[:37] + "..."
+    return text or "check"
+
 
 class DiagramGenerator:
     """Generate PlantUML diagrams from AST"""
     
+    # Styling shared by every diagram of a kind
+    _ACTIVITY_SKIN = (
+        "skinparam activity {",
+        "  BackgroundColor #B4E7CE",
+        "  BorderColor #2C5F2D",
+        "}"
+    )
+    _DIAMOND_SKIN = (
+        "skinparam activityDiamond {",
+        "  BackgroundColor #FFD966",
+        "  BorderColor #CC9900",
+        "}"
+    )
+    _MODULE_SKIN = (
+        "skinparam activity {",
+        "  BackgroundColor #E8F4F8",
+        "  BorderColor #4A90E2",
+        "}"
+    )
+    
+    # Fixed lines between a flow diagram's title and its entry label
+    _FLOW_PRELUDE = ("", *_ACTIVITY_SKIN, *_DIAMOND_SKIN, "", "start", "")
+    _FLOW_SUFFIX = ("", "stop", "", "@enduml")
+    
+    _MODULE_PRELUDE = ("@startuml", "title Module Structure", "", *_MODULE_SKIN, "", "start", "")
+    _MODULE_SUFFIX = ("stop", "", "@enduml")
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.output_dir = Path(config.get('output_dir', './diagrams'))
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.max_depth = config.get('max_depth', 5)
+        
+        # Node type -> handler; other types just have their children walked
+        self._handlers = {
+            'if_statement': self._handle_if,
+            'for_statement': self._handle_for,
+            'while_statement': self._handle_while,
+            'switch_statement': self._handle_switch,
+            'return_statement': self._handle_return,
+            'call_expression': self._handle_call,
+            'compound_statement': self._handle_compound
+        }
+        
+        # Node text by byte range, valid for one generate_function_flow call
+        self._text_cache: Dict[Tuple[int, int], str] = {}
+        
+        # Body lines by (file, body range, file text), reused on regeneration
+        self._flow_cache: Dict[Tuple[str, int, int, str], List[str]] = {}
+        
+        # Last file text walked, and its UTF-8 encoding
+        self._encoded_text: Optional[str] = None
+        self._encoded_source = b""
     
     def generate_function_flow(self, func: FunctionAST, content: str = "", output_name: Optional[str] = None) -> str:
         """Generate function flow diagram from AST"""
@@ -30,18 +171,7 @@ class DiagramGenerator:
         plantuml = [
             "@startuml",
             f"title Function Flow - {func.name}",
-            "",
-            "skinparam activity {",
-            "  BackgroundColor #B4E7CE",
-            "  BorderColor #2C5F2D",
-            "}",
-            "skinparam activityDiamond {",
-            "  BackgroundColor #FFD966",
-            "  BorderColor #CC9900",
-            "}",
-            "",
-            "start",
-            "",
+            *self._FLOW_PRELUDE,
             f":{self._safe_label(func.name)};",
             ""
         ]
@@ -53,260 +183,292 @@ class DiagramGenerator:
                 plantuml.append(f"  Returns {self._safe_label(func.return_type)}")
             if func.parameters:
                 plantuml.append(f"  {len(func.parameters)} parameter(s)")
-            plantuml.append("end note")
-            plantuml.append("")
+            plantuml.extend(("end note", ""))
         
         # Generate flow from AST body
         if func.body_node and content:
-            try:
-                self._ast_to_plantuml(func.body_node, content, plantuml, depth=0)
-            except Exception as e:
-                console.print(f"[yellow]Warning: {e}[/yellow]")
-                plantuml.append(":execute function body;")
+            # The file text is part of the key, so edited sources miss; its
+            # hash is cached on the str, making repeat lookups cheap
+            key = (func.file_path, func.body_node.start_byte, func.body_node.end_byte, content)
+            body = self._flow_cache.get(key)
+            if body is None:
+                body, ok = self._compile_flow(func.body_node, content)
+                if ok:
+                    if len(self._flow_cache) >= _FLOW_CACHE_SIZE:
+                        del self._flow_cache[next(iter(self._flow_cache))]
+                    self._flow_cache[key] = body
+            plantuml.extend(body)
         else:
             plantuml.append(":execute function body;")
         
-        plantuml.extend([
-            "",
-            "stop",
-            "",
-            "@enduml"
-        ])
+        plantuml.extend(self._FLOW_SUFFIX)
         
         # Write file
         output_path = self.output_dir / f"{output_name}.puml"
-        output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+        _write_lines(output_path, plantuml)
         console.print(f"[green]✓ Saved: {output_path.name}[/green]")
         
         return str(output_path)
     
-    def _ast_to_plantuml(self, node: Any, content: str, plantuml: List[str], depth: int = 0) -> None:
+    def _compile_flow(self, body_node: Any, content: str) -> Tuple[List[str], bool]:
+        """PlantUML lines for a function body, and whether the walk completed"""
+        # Node offsets index the UTF-8 bytes, not the str; functions of one
+        # file usually come together, so the last encoding is kept
+        if content is not self._encoded_text:
+            self._encoded_text, self._encoded_source = content, content.encode('utf-8')
+        
+        body: List[str] = []
+        self._text_cache.clear()
+        try:
+            self._ast_to_plantuml(body_node, self._encoded_source, body, depth=0)
+        except Exception as e:
+            console.print(f"[yellow]Warning: {e}[/yellow]")
+            body.append(":execute function body;")
+            return body, False
+        finally:
+            self._text_cache.clear()
+        return body, True
+    
+    def generate_function_flows(self, funcs: List[FunctionAST], parser: ASTParser) -> List[str]:
+        """Generate flow diagrams for many functions, across CPU cores for large batches"""
+        max_workers = self.config.get('max_workers')
+        if len(funcs) < _PARALLEL_FLOW_THRESHOLD or max_workers == 1:
+            output_paths = []
+            for func in funcs:
+                try:
+                    body_node = parser.get_body_node(func)
+                    content = parser.files_content.get(func.file_path, "")
+                    output_paths.append(self.generate_function_flow(replace(func, body_node=body_node), content))
+                except Exception as e:
+                    console.print(f"[yellow]Warning: {func.name}: {e}[/yellow]")
+            return output_paths
+        
+        # Overloads share an output file; as in the serial loop the last one
+        # wins, so only it is generated (also keeps the result deterministic)
+        names = [f"flow_{self._safe_name(func.name)}" for func in funcs]
+        last_for_name = {name: i for i, name in enumerate(names)}
+        
+        # One task per file so each worker parses a file once; copies
+        # without body nodes, which cannot be pickled
+        by_file: Dict[str, List[Tuple[int, FunctionAST]]] = defaultdict(list)
+        for i in last_for_name.values():
+            func = funcs[i]
+            by_file[func.file_path].append((i, replace(func, body_node=None)))
+        tasks = [
+            (file_path, parser.files_content.get(file_path, ""), [func for _, func in entries])
+            for file_path, entries in by_file.items()
+        ]
+        
+        paths: List[Optional[str]] = [None] * len(funcs)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_flow_worker,
+            initargs=(self.config, parser.config)
+        ) as pool:
+            for entries, results in zip(by_file.values(), pool.map(_worker_flow_file, tasks)):
+                for (i, func), (path, error) in zip(entries, results):
+                    if error is not None:
+                        console.print(f"[yellow]Warning: {func.name}: {error}[/yellow]")
+                    paths[i] = path
+        
+        final_paths = [paths[last_for_name[name]] for name in names]
+        return [path for path in final_paths if path is not None]
+    
+    def _ast_to_plantuml(self, node: Any, source: bytes, plantuml: List[str], depth: int = 0) -> None:
         """Convert AST node to PlantUML"""
+        # Work items are (node, depth, None) to visit a node or
+        # (None, depth, line) to emit a closing line once its body is done;
+        # children are pushed in reverse so they pop in source order.
+        # Nodes beyond max_depth are never pushed (see _push_nested)
         if depth >= self.max_depth or not node:
             return
+        stack: _WorkStack = [(node, depth, None)]
+        handlers = self._handlers
         
-        indent = "  " * depth
-        
-        # Handle different node types
-        if node.type == 'if_statement':
-            self._handle_if(node, content, plantuml, indent, depth)
-        elif node.type == 'for_statement':
-            self._handle_for(node, content, plantuml, indent, depth)
-        elif node.type == 'while_statement':
-            self._handle_while(node, content, plantuml, indent, depth)
-        elif node.type == 'switch_statement':
-            self._handle_switch(node, content, plantuml, indent, depth)
-        elif node.type == 'return_statement':
-            plantuml.append(f"{indent}:return;")
-        elif node.type == 'call_expression':
-            # Extract function name
-            if node.children:
-                func_name = self._get_node_text(node.children[0], content)
-                if func_name:
-                    plantuml.append(f"{indent}:{self._safe_label(func_name)};")
-        elif node.type == 'compound_statement':
-            # Process statements in body
-            for child in node.children:
-                if child.type != '{' and child.type != '}':
-                    self._ast_to_plantuml(child, content, plantuml, depth)
-        else:
-            # Process children
-            for child in node.children:
-                self._ast_to_plantuml(child, content, plantuml, depth)
+        while stack:
+            node, depth, post = stack.pop()
+            if post is not None:
+                plantuml.append(post)
+                continue
+            
+            handler = handlers.get(node.type)
+            if handler:
+                handler(node, source, plantuml, stack, "  " * depth, depth)
+            else:
+                # Process children
+                stack.extend((child, depth, None) for child in reversed(node.children))
     
-    def _handle_if(self, node: Any, content: str, plantuml: List[str], indent: str, depth: int) -> None:
+    def _push_nested(self, stack: _WorkStack, node: Any, depth: int) -> None:
+        """Queue a nested body one level deeper, unless that reaches max_depth"""
+        if depth + 1 < self.max_depth:
+            stack.append((node, depth + 1, None))
+    
+    def _handle_if(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
         """Handle if statement"""
-        condition = self._extract_condition(node, content)
+        condition = self._extract_condition(node, source)
         safe_cond = self._safe_condition(condition)
         
         plantuml.append(f"{indent}if ({safe_cond}) then (yes)")
+        stack.append((None, depth, f"{indent}endif"))
+        
+        else_body = self._find_else(node)
+        if else_body:
+            self._push_nested(stack, else_body, depth)
+            stack.append((None, depth, f"{indent}else (no)"))
         
         then_body = self._find_body(node)
         if then_body:
-            self._ast_to_plantuml(then_body, content, plantuml, depth + 1)
+            self._push_nested(stack, then_body, depth)
         else:
             plantuml.append(f"{indent}  :process;")
-        
-        else_body = self._find_else(node)
-        if else_body:
-            plantuml.append(f"{indent}else (no)")
-            self._ast_to_plantuml(else_body, content, plantuml, depth + 1)
-        
-        plantuml.append(f"{indent}endif")
     
-    def _handle_for(self, node: Any, content: str, plantuml: List[str], indent: str, depth: int) -> None:
+    def _handle_for(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
         """Handle for loop"""
-        condition = self._extract_for_condition(node, content)
+        condition = self._extract_for_condition(node, source)
         safe_cond = self._safe_condition(condition)
         
         plantuml.append(f"{indent}repeat")
+        stack.append((None, depth, f"{indent}repeat while ({safe_cond})"))
         
         body = self._find_body(node)
         if body:
-            self._ast_to_plantuml(body, content, plantuml, depth + 1)
+            self._push_nested(stack, body, depth)
         else:
             plantuml.append(f"{indent}  :loop body;")
-        
-        plantuml.append(f"{indent}repeat while ({safe_cond})")
     
-    def _handle_while(self, node: Any, content: str, plantuml: List[str], indent: str, depth: int) -> None:
+    def _handle_while(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
         """Handle while loop"""
-        condition = self._extract_condition(node, content)
+        condition = self._extract_condition(node, source)
         safe_cond = self._safe_condition(condition)
         
         plantuml.append(f"{indent}while ({safe_cond}) is (true)")
+        stack.append((None, depth, f"{indent}endwhile (false)"))
         
         body = self._find_body(node)
         if body:
-            self._ast_to_plantuml(body, content, plantuml, depth + 1)
+            self._push_nested(stack, body, depth)
         else:
             plantuml.append(f"{indent}  :loop body;")
-        
-        plantuml.append(f"{indent}endwhile (false)")
     
-    def _handle_switch(self, node: Any, content: str, plantuml: List[str], indent: str, depth: int) -> None:
+    def _handle_switch(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
         """Handle switch statement"""
-        condition = self._extract_condition(node, content)
+        condition = self._extract_condition(node, source)
         safe_cond = self._safe_condition(condition)
         
         plantuml.append(f"{indent}switch ({safe_cond})")
+        stack.append((None, depth, f"{indent}endswitch"))
         
         body = self._find_body(node)
         if body:
-            for child in body.children:
+            # Each case label is pushed above its statements
+            for child in reversed(body.children):
                 if child.type == 'case_statement':
-                    case_label = self._get_case_label(child, content)
-                    plantuml.append(f"{indent}case ({self._safe_label(case_label)})")
-                    self._ast_to_plantuml(child, content, plantuml, depth + 1)
+                    case_label = self._get_case_label(child, source)
+                    self._push_nested(stack, child, depth)
+                    stack.append((None, depth, f"{indent}case ({self._safe_label(case_label)})"))
                 elif child.type == 'default_statement':
-                    plantuml.append(f"{indent}case (default)")
-                    self._ast_to_plantuml(child, content, plantuml, depth + 1)
-        
-        plantuml.append(f"{indent}endswitch")
+                    self._push_nested(stack, child, depth)
+                    stack.append((None, depth, f"{indent}case (default)"))
+    
+    def _handle_return(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
+        """Handle return statement"""
+        plantuml.append(f"{indent}:return;")
     
-    def _extract_condition(self, node: Any, content: str) -> str:
+    def _handle_call(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
+        """Handle function call"""
+        # Extract function name
+        if node.children:
+            func_name = self._get_node_text(node.children[0], source)
+            if func_name:
+                plantuml.append(f"{indent}:{self._safe_label(func_name)};")
+    
+    def _handle_compound(self, node: Any, source: bytes, plantuml: List[str], stack: _WorkStack, indent: str, depth: int) -> None:
+        """Handle block: process statements in body"""
+        stack.extend(
+            (child, depth, None) for child in reversed(node.children)
+            if child.type not in _BRACE_TYPES
+        )
+    
+    def _extract_condition(self, node: Any, source: bytes) -> str:
         """Extract condition text from node"""
-        for child in node.children:
-            if child.type in ['condition_clause', 'parenthesized_expression']:
-                if child.children:
-                    return self._get_node_text(child.children[0], content)
-        return "condition"
+        cond = node.child_by_field_name('condition')
+        if not cond:
+            return "condition"
+        # The expression inside condition_clause's parentheses
+        value = cond.child_by_field_name('value')
+        return self._get_node_text(value or cond, source)
     
-    def _extract_for_condition(self, node: Any, content: str) -> str:
+    def _extract_for_condition(self, node: Any, source: bytes) -> str:
         """Extract for loop condition"""
-        for child in node.children:
-            if child.type == 'for_range_loop':
-                return "range loop"
-            elif '(' in str(child.type):
-                if len(child.children) > 1:
-                    return self._get_node_text(child.children[1], content)
-        return "loop"
+        cond = node.child_by_field_name('condition')
+        return self._get_node_text(cond, source) if cond else "loop"
     
     def _find_body(self, node: Any) -> Optional[Any]:
         """Find body of control structure"""
-        for child in node.children:
-            if child.type == 'compound_statement':
-                return child
-        return None
+        return node.child_by_field_name('body') or node.child_by_field_name('consequence')
     
     def _find_else(self, node: Any) -> Optional[Any]:
         """Find else clause"""
-        found_then = False
-        for child in node.children:
-            if child.type == 'compound_statement':
-                found_then = True
-            elif found_then and child.type in ['if_statement', 'compound_statement']:
-                return child
-        return None
+        return node.child_by_field_name('alternative')
     
-    def _get_case_label(self, node: Any, content: str) -> str:
+    def _get_case_label(self, node: Any, source: bytes) -> str:
         """Get case label"""
         for child in node.children:
-            if child.type in ['case', 'default']:
+            if child.type in _CASE_TYPES:
                 if child.next_sibling:
-                    return self._get_node_text(child.next_sibling, content)
+                    return self._get_node_text(child.next_sibling, source)
         return "case"
     
-    def _get_node_text(self, node: Any, content: str) -> str:
-        """Get text from node using content"""
-        try:
-            return content[node.start_byte:node.end_byte].strip()
-        except:
-            return node.type.replace('_', ' ')
+    def _get_node_text(self, node: Any, source: bytes) -> str:
+        """Get text from node (tree-sitter offsets are byte offsets)"""
+        if node is None:
+            return ""
+        key = (node.start_byte, node.end_byte)
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self._text_cache[key] = source[key[0]:key[1]].decode('utf-8', 'replace').strip()
+        return text
     
     def _safe_label(self, text: str) -> str:
         """Make label safe for PlantUML"""
-        if not text:
-            return "item"
-        # Remove colons and semicolons
-        text = str(text).replace(':', ' ').replace(';', '').strip()
-        # Limit length
-        if len(text) > 50:
-            text = text[:47] + "..."
-        return text or "item"
+        return _label_text(text)
     
     def _safe_condition(self, text: str) -> str:
         """Make condition safe for PlantUML"""
-        if not text:
-            return "check"
-        # More aggressive sanitization for conditions
-        text = str(text).replace(':', ' ').replace(';', '').replace('|', ' or ')
-        text = text.replace('[', '(').replace(']', ')')
-        text = text.strip()
-        if len(text) > 40:
-            text = text[:37] + "..."
-        return text or "check"
+        return _condition_text(text)
     
     def _safe_name(self, name: str) -> str:
         """Make name safe for filename"""
-        import re
-        safe = re.sub(r'[^a-zA-Z0-9_]', '_', str(name))
+        safe = _SAFE_NAME_RE.sub('_', name if isinstance(name, str) else str(name))
         return safe[:50] or "function"
     
     def generate_module_diagram(self, chunks: List[ASTChunk], output_name: str = "module_diagram") -> str:
         """Generate module structure diagram"""
         console.print("[blue]Generating module diagram...[/blue]")
         
-        plantuml = [
-            "@startuml",
-            "title Module Structure",
-            "",
-            "skinparam activity {",
-            "  BackgroundColor #E8F4F8",
-            "  BorderColor #4A90E2",
-            "}",
-            "",
-            "start",
-            ""
-        ]
+        plantuml = list(self._MODULE_PRELUDE)
         
-        # Group by file
-        files = {}
+        # Group by directory, resolving each file's directory name once
+        files: Dict[str, List[ASTChunk]] = defaultdict(list)
+        dir_names: Dict[str, str] = {}
         for chunk in chunks:
-            file_path = Path(chunk.file_path)
-            dir_name = file_path.parent.name or "root"
-            if dir_name not in files:
-                files[dir_name] = []
+            dir_name = dir_names.get(chunk.file_path)
+            if dir_name is None:
+                dir_name = dir_names[chunk.file_path] = Path(chunk.file_path).parent.name or "root"
             files[dir_name].append(chunk)
         
         # Add partitions
         for dir_name, dir_chunks in list(files.items())[:10]:
             plantuml.append(f'partition "{self._safe_label(dir_name)}" {{')
-            for chunk in dir_chunks[:5]:
-                plantuml.append(f"  :{self._safe_label(chunk.name)};")
+            plantuml.extend(f"  :{self._safe_label(chunk.name)};" for chunk in dir_chunks[:5])
             if len(dir_chunks) > 5:
                 plantuml.append(f"  note right: {len(dir_chunks) - 5} more")
-            plantuml.append("}")
-            plantuml.append("")
+            plantuml.extend(("}", ""))
         
-        plantuml.extend([
-            "stop",
-            "",
-            "@enduml"
-        ])
+        plantuml.extend(self._MODULE_SUFFIX)
         
         output_path = self.output_dir / f"{output_name}.puml"
-        output_path.write_text('\n'.join(plantuml), encoding='utf-8')
+        _write_lines(output_path, plantuml)
         console.print(f"[green]✓ Saved: {output_path.name}[/green]")
         
         return str(output_path)
@@ -0,0 +1,216 @@
+"""
+Batched Ollama embeddings
+"""
+
+from pathlib import Path
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import sqlite3
+import httpx
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+@lru_cache(maxsize=4)
+def _shared_client(base_url: str, timeout: float) -> httpx.Client:
+    """Keep-alive client shared by every embedder talking to base_url"""
+    return httpx.Client(
+        base_url=base_url,
+        timeout=httpx.Timeout(timeout, connect=10.0),
+        limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=30.0)
+    )
+
+
+class EmbeddingCache:
+    """Persistent text -> vector cache in SQLite, keyed by content hash"""
+    
+    # Stay under SQLite's bound-parameter limit in IN (...) queries
+    _SELECT_CHUNK = 500
+    
+    def __init__(self, db_path: Path):
+        """
+        Initialize cache (the database is opened on first use)
+        
+        Args:
+            db_path: SQLite file holding the vectors
+        """
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open connection, creating the database and table on first use"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS emb(hash BLOB PRIMARY KEY, vec BLOB)")
+        return self._conn
+    
+    @staticmethod
+    def key(text: str, model: str) -> bytes:
+        """Hash of model name and content"""
+        return hashlib.blake2b(f"{model}\0{text}".encode('utf-8'), digest_size=16).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Cached vectors for whichever keys are present"""
+        found: Dict[bytes, List[float]] = {}
+        for i in range(0, len(keys), self._SELECT_CHUNK):
+            chunk = keys[i:i + self._SELECT_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT hash, vec FROM emb WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for key, vec in rows:
+                found[key] = np.frombuffer(vec, dtype=np.float16).astype(np.float32).tolist()
+        return found
+    
+    def put_many(self, items: List[tuple]) -> None:
+        """Store (key, vector) pairs as float16"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO emb(hash, vec) VALUES (?, ?)",
+                [(key, np.asarray(vec, dtype=np.float16).tobytes()) for key, vec in items]
+            )
+
+
+class BatchedOllamaEmbeddings(Embeddings):
+    """Embed documents through Ollama's /api/embed in fixed-size batches"""
+    
+    def __init__(
+        self,
+        model: str,
+        base_url: str = "http://localhost:11434",
+        batch_size: int = 32,
+        concurrency: int = 10,
+        timeout: float = 120.0,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        """
+        Initialize embedder
+        
+        Args:
+            model: Ollama embedding model name
+            base_url: Ollama server URL
+            batch_size: Texts sent per /api/embed request
+            concurrency: Batch requests kept in flight at once
+            timeout: Per-request timeout in seconds
+            cache: Optional persistent cache consulted before Ollama
+        """
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.cache = cache
+        
+        # Sequential requests reuse pooled connections, also across instances
+        self.client = _shared_client(self.base_url, timeout)
+        
+        # Interactive sessions repeat questions; keep their vectors
+        self._query_vector = lru_cache(maxsize=256)(self._embed_query)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sending only cache misses to Ollama"""
+        if not texts:
+            return []
+        if self.cache is None:
+            # Identical chunks (inline accessors, template copies) are
+            # embedded once and the vector shared by every occurrence
+            unique = list(dict.fromkeys(texts))
+            if len(unique) == len(texts):
+                return self._embed_uncached(texts)
+            vectors = dict(zip(unique, self._embed_uncached(unique)))
+            return [vectors[text] for text in texts]
+        
+        keys = [self.cache.key(text, self.model) for text in texts]
+        found = self.cache.get_many(keys)
+        
+        # Embed each missing text once, even if it repeats
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            vectors = self._embed_uncached(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+        
+        return [found[key] for key in keys]
+    
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, batch_size per HTTP request"""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        
+        # Overlap requests when there is more than one batch, unless we are
+        # already inside an event loop (asyncio.run would refuse)
+        if self.concurrency > 1 and len(batches) > 1 and not self._in_event_loop():
+            results = asyncio.run(self._embed_batches_async(batches))
+        else:
+            results = [self._embed_batch(batch) for batch in batches]
+        
+        return [vector for batch_vectors in results for vector in batch_vectors]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query, reusing the vector of a repeated one"""
+        return list(self._query_vector(text))
+    
+    def _embed_query(self, text: str) -> Tuple[float, ...]:
+        """Embed a single query (immutable, so it can be cached)"""
+        return tuple(self._embed_batch([text])[0])
+    
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch, falling back to /api/embeddings on older servers"""
+        resp = self.client.post('/api/embed', json={"model": self.model, "input": batch})
+        if resp.status_code != 404:
+            resp.raise_for_status()
+            embeddings = resp.json().get("embeddings")
+            if embeddings is not None:
+                return embeddings
+        
+        # Servers without /api/embed only take one prompt per request
+        return [self._embed_one(text) for text in batch]
+    
+    async def _embed_batches_async(self, batches: List[List[str]]) -> List[List[List[float]]]:
+        """Embed batches concurrently, at most `concurrency` in flight"""
+        sem = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            async def one(batch: List[str]) -> List[List[float]]:
+                async with sem:
+                    resp = await client.post('/api/embed', json={"model": self.model, "input": batch})
+                    if resp.status_code != 404:
+                        resp.raise_for_status()
+                        embeddings = resp.json().get("embeddings")
+                        if embeddings is not None:
+                            return embeddings
+                    
+                    # Servers without /api/embed only take one prompt per request
+                    vectors = []
+                    for text in batch:
+                        resp = await client.post('/api/embeddings', json={"model": self.model, "prompt": text})
+                        resp.raise_for_status()
+                        vectors.append(resp.json()["embedding"])
+                    return vectors
+            
+            # gather keeps results in input order
+            return await asyncio.gather(*(one(batch) for batch in batches))
+    
+    @staticmethod
+    def _in_event_loop() -> bool:
+        """Whether this thread is already running an asyncio loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def _embed_one(self, text: str) -> List[float]:
+        """Embed a single text via the legacy /api/embeddings endpoint"""
+        resp = self.client.post('/api/embeddings', json={"model": self.model, "prompt": text})
+        resp.raise_for_status()
+        return resp.json()["embedding"]
@@ -2,21 +2,19 @@
 RAG System using ChromaDB with AST-based chunks
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import chromadb
 from langchain_core.documents import Document
 from rich.console import Console
 from .ast_parser import ASTChunk
+from .embeddings import BatchedOllamaEmbeddings, EmbeddingCache
+from .vector_store import FAISSVectorStore, MemoryVectorStore
 
 # Try different import paths for compatibility
-try:
-    from langchain_ollama import OllamaEmbeddings
-except ImportError:
-    try:
-        from langchain_community.embeddings import OllamaEmbeddings
-    except ImportError:
-        from langchain.embeddings import OllamaEmbeddings
-
 try:
     from langchain_chroma import Chroma
 except ImportError:
@@ -27,6 +25,15 @@ except ImportError:
 
 console = Console()
 
+# Largest Chroma write; the client may lower it further
+_CHROMA_BATCH_SIZE = 5000
+
+# In-process vector store backends selectable with vectordb.backend
+_LOCAL_STORES = {
+    'faiss': FAISSVectorStore,
+    'memory': MemoryVectorStore,
+}
+
 
 class RAGSystem:
     """RAG system using ChromaDB and Ollama embeddings"""
@@ -36,21 +43,30 @@ class RAGSystem:
         self.ollama_config = config.get('ollama', {})
         self.vectordb_config = config.get('vectordb', {})
         
-        # Initialize embeddings
+        persist_dir = self.vectordb_config.get('persist_directory', './chroma_db')
+        
+        # Initialize embeddings, reusing vectors of unchanged chunks
         console.print("[blue]Initializing embeddings...[/blue]")
-        self.embeddings = OllamaEmbeddings(
+        self.embeddings = BatchedOllamaEmbeddings(
             model=self.ollama_config.get('embedding_model', 'jina/jina-embeddings-v2-base-en'),
-            base_url=self.ollama_config.get('base_url', 'http://localhost:11434')
+            base_url=self.ollama_config.get('base_url', 'http://localhost:11434'),
+            batch_size=self.ollama_config.get('embed_batch_size', 32),
+            concurrency=self.ollama_config.get('concurrency', 10),
+            cache=EmbeddingCache(Path(persist_dir) / 'emb_cache.sqlite')
         )
         
         # Initialize ChromaDB
-        persist_dir = self.vectordb_config.get('persist_directory', './chroma_db')
         collection_name = self.vectordb_config.get('collection_name', 'cpp_codebase')
         
-        self.vectorstore: Optional[Chroma] = None
+        # 'chroma', or 'faiss' / 'memory' (exact in-process search for small corpora)
+        self.backend = self.vectordb_config.get('backend', 'chroma')
+        self.vectorstore: Optional[Any] = None
         self.persist_directory = Path(persist_dir)
         self.collection_name = collection_name
         
+        # Results of repeated (query, k) lookups; cleared when the store changes
+        self._cached_search = lru_cache(maxsize=256)(self._search)
+        
         console.print("[green]✓ RAG system initialized[/green]")
     
     def create_vectorstore_from_chunks(self, chunks: List[ASTChunk]) -> None:
@@ -58,9 +74,8 @@ class RAGSystem:
         console.print(f"[blue]Creating vector store from {len(chunks)} chunks...[/blue]")
         
         # Convert chunks to LangChain documents
-        documents = []
-        for chunk in chunks:
-            doc = Document(
+        documents = [
+            Document(
                 page_content=chunk.content,
                 metadata={
                     'chunk_type': chunk.chunk_type,
@@ -71,23 +86,85 @@ class RAGSystem:
                     **chunk.metadata
                 }
             )
-            documents.append(doc)
+            for chunk in chunks
+        ]
         
         # Create persist directory
         self.persist_directory.mkdir(parents=True, exist_ok=True)
+        self._cached_search.cache_clear()
         
         # Create vectorstore
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            collection_name=self.collection_name,
-            persist_directory=str(self.persist_directory)
+        if self.backend in _LOCAL_STORES:
+            self.vectorstore = _LOCAL_STORES[self.backend].from_documents(
+                documents=documents,
+                embedding=self.embeddings,
+                persist_directory=self.persist_directory
+            )
+        else:
+            self._write_chroma(chunks, documents)
+        
+        console.print(f"[green]✓ Vector store created with {len(chunks)} chunks[/green]")
+    
+    def _write_chroma(self, chunks: List[ASTChunk], documents: List[Document]) -> None:
+        """
+        Write documents to the Chroma collection in large explicit batches
+        
+        Embeddings are computed through the batched embedder and handed to
+        Chroma directly, so Chroma never calls back into Ollama; the next
+        batch is embedded while Chroma indexes the current one. Stable ids
+        make re-indexing update chunks instead of duplicating them.
+        """
+        texts = [doc.page_content for doc in documents]
+        ids = self._chunk_ids(chunks)
+        # Chroma rejects empty list values (e.g. functions without parameters)
+        metadatas = [
+            {key: value for key, value in doc.metadata.items() if value != []}
+            for doc in documents
+        ]
+        
+        # The PersistentClient writes through to disk; no persist() step needed
+        client = chromadb.PersistentClient(path=str(self.persist_directory))
+        # Larger HNSW batch/sync thresholds defer index flushes during ingest
+        collection = client.get_or_create_collection(
+            self.collection_name,
+            metadata={
+                "hnsw:space": "cosine",
+                "hnsw:batch_size": 1000,
+                "hnsw:sync_threshold": 10000
+            }
         )
         
-        # Persist
-        self.vectorstore.persist()
+        batch_size = min(_CHROMA_BATCH_SIZE, client.get_max_batch_size())
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(self.embeddings.embed_documents, texts[:batch_size])
+            for i in range(0, len(ids), batch_size):
+                embeddings = pending.result()
+                if i + batch_size < len(ids):
+                    pending = pool.submit(self.embeddings.embed_documents, texts[i + batch_size:i + 2 * batch_size])
+                collection.upsert(
+                    ids=ids[i:i + batch_size],
+                    embeddings=embeddings,
+                    documents=texts[i:i + batch_size],
+                    metadatas=metadatas[i:i + batch_size]
+                )
         
-        console.print(f"[green]✓ Vector store created with {len(chunks)} chunks[/green]")
+        self.vectorstore = Chroma(
+            client=client,
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings
+        )
+    
+    @staticmethod
+    def _chunk_ids(chunks: List[ASTChunk]) -> List[str]:
+        """Stable, unique id per chunk"""
+        ids = []
+        seen: Dict[str, int] = {}
+        for chunk in chunks:
+            chunk_id = f"{chunk.file_path}:{chunk.line_start}-{chunk.line_end}:{chunk.chunk_type}:{chunk.name}"
+            count = seen.get(chunk_id, 0)
+            seen[chunk_id] = count + 1
+            ids.append(f"{chunk_id}#{count}" if count else chunk_id)
+        return ids
     
     def load_vectorstore(self) -> bool:
         """Load existing vectorstore"""
@@ -95,6 +172,11 @@ class RAGSystem:
             if not self.persist_directory.exists():
                 return False
             
+            self._cached_search.cache_clear()
+            if self.backend in _LOCAL_STORES:
+                self.vectorstore = _LOCAL_STORES[self.backend].load(self.persist_directory, self.embeddings)
+                return self.vectorstore is not None
+            
             self.vectorstore = Chroma(
                 collection_name=self.collection_name,
                 embedding_function=self.embeddings,
@@ -109,6 +191,15 @@ class RAGSystem:
         if not self.vectorstore:
             return []
         
+        # Copies down to the metadata values (parameters is a list), so
+        # callers cannot alter the cached results
+        return [
+            {**result, 'metadata': copy.deepcopy(result['metadata'])}
+            for result in self._cached_search(query, k)
+        ]
+    
+    def _search(self, query: str, k: int) -> Tuple[Dict[str, Any], ...]:
+        """Run a similarity search against the current vector store"""
         results = self.vectorstore.similarity_search_with_score(query, k=k)
         
         formatted_results = []
@@ -116,10 +207,10 @@ class RAGSystem:
             formatted_results.append({
                 'content': doc.page_content,
                 'metadata': doc.metadata,
-                'score': score
+                'score': score  # Cosine distance on every backend (lower is better)
             })
         
-        return formatted_results
+        return tuple(formatted_results)
     
     def get_retriever(self, k: int = 5):
         """Get LangChain retriever"""
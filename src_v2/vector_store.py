@@ -0,0 +1,241 @@
+"""
+In-process vector store backends for small corpora
+"""
+
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import pickle
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+# Optional backend: only needed when vectordb.backend is 'faiss'
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+# Optional SIMD kernels for the 'memory' backend; NumPy is used without them
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+
+def _require_faiss() -> None:
+    if faiss is None:
+        raise ImportError("vectordb backend 'faiss' needs the faiss-cpu package: pip install faiss-cpu")
+
+
+class StoreRetriever(BaseRetriever):
+    """LangChain retriever over any store with similarity_search_with_score"""
+    
+    store: Any
+    k: int = 4
+    
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return [doc for doc, _ in self.store.similarity_search_with_score(query, k=self.k)]
+
+
+class FAISSVectorStore:
+    """
+    Brute-force cosine search with a FAISS fp16 flat index
+    
+    No graph is built, so indexing is just one matrix copy; search is a
+    brute-force inner product over normalized vectors, fast for corpora up
+    to ~100K chunks. Vectors are stored as float16 (half the memory and
+    scan bandwidth of float32). Scores are cosine distances (lower is
+    better), as the Chroma backend reports them.
+    """
+    
+    INDEX_FILE = 'faiss.index'
+    DOCS_FILE = 'faiss_docs.pkl'
+    
+    def __init__(
+        self,
+        embedding: Embeddings,
+        index: Any,
+        documents: List[Document],
+        persist_directory: Optional[Path] = None
+    ):
+        self.embedding = embedding
+        self.index = index
+        self.documents = documents
+        self.persist_directory = Path(persist_directory) if persist_directory else None
+    
+    @classmethod
+    def from_documents(
+        cls,
+        documents: List[Document],
+        embedding: Embeddings,
+        persist_directory: Optional[Path] = None
+    ) -> 'FAISSVectorStore':
+        """Embed documents, build the index and persist it if a directory is given"""
+        _require_faiss()
+        
+        index = None
+        if documents:
+            vectors = np.asarray(
+                embedding.embed_documents([doc.page_content for doc in documents]),
+                dtype=np.float32
+            )
+            faiss.normalize_L2(vectors)
+            index = faiss.IndexScalarQuantizer(
+                vectors.shape[1], faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+            )
+            index.add(vectors)
+        
+        store = cls(embedding, index, list(documents), persist_directory)
+        if persist_directory:
+            store.save()
+        return store
+    
+    @classmethod
+    def load(cls, persist_directory: Path, embedding: Embeddings) -> Optional['FAISSVectorStore']:
+        """Load a persisted store, or None if there is none"""
+        _require_faiss()
+        
+        persist_directory = Path(persist_directory)
+        docs_path = persist_directory / cls.DOCS_FILE
+        if not docs_path.exists():
+            return None
+        
+        with open(docs_path, 'rb') as f:
+            documents = pickle.load(f)
+        index_path = persist_directory / cls.INDEX_FILE
+        index = faiss.read_index(str(index_path)) if index_path.exists() else None
+        return cls(embedding, index, documents, persist_directory)
+    
+    def save(self) -> None:
+        """Write index and documents to persist_directory"""
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        index_path = self.persist_directory / self.INDEX_FILE
+        if self.index is not None:
+            faiss.write_index(self.index, str(index_path))
+        elif index_path.exists():
+            index_path.unlink()
+        with open(self.persist_directory / self.DOCS_FILE, 'wb') as f:
+            pickle.dump(self.documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Top-k documents with cosine distance"""
+        if self.index is None or self.index.ntotal == 0:
+            return []
+        
+        q = np.asarray([self.embedding.embed_query(query)], dtype=np.float32)
+        faiss.normalize_L2(q)
+        scores, ids = self.index.search(q, min(k, self.index.ntotal))
+        return [
+            (self.documents[i], 1.0 - float(score))
+            for score, i in zip(scores[0], ids[0])
+            if i != -1
+        ]
+    
+    def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> StoreRetriever:
+        """LangChain retriever returning the top k documents"""
+        return StoreRetriever(store=self, k=(search_kwargs or {}).get('k', 4))
+
+
+class MemoryVectorStore:
+    """
+    Brute-force cosine search over one contiguous float16 matrix
+    
+    Vectors are kept as an (N, d) float16 array rather than a list of lists
+    so the distance kernel (SimSIMD when installed, NumPy otherwise) runs
+    over contiguous rows at half the float32 memory traffic. Scores are
+    cosine distances (lower is better), as the Chroma backend reports them.
+    """
+    
+    VECTORS_FILE = 'memory_vectors.npy'
+    DOCS_FILE = 'memory_docs.pkl'
+    
+    def __init__(
+        self,
+        embedding: Embeddings,
+        vectors: np.ndarray,
+        documents: List[Document],
+        persist_directory: Optional[Path] = None
+    ):
+        self.embedding = embedding
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float16)
+        self.documents = documents
+        self.persist_directory = Path(persist_directory) if persist_directory else None
+        
+        # Row norms for the NumPy path, computed once in float32
+        self._norms = np.linalg.norm(self.vectors.astype(np.float32), axis=1)
+    
+    @classmethod
+    def from_documents(
+        cls,
+        documents: List[Document],
+        embedding: Embeddings,
+        persist_directory: Optional[Path] = None
+    ) -> 'MemoryVectorStore':
+        """Embed documents and persist them if a directory is given"""
+        if documents:
+            vectors = np.asarray(
+                embedding.embed_documents([doc.page_content for doc in documents]),
+                dtype=np.float32
+            )
+        else:
+            vectors = np.empty((0, 0), dtype=np.float16)
+        
+        store = cls(embedding, vectors, list(documents), persist_directory)
+        if persist_directory:
+            store.save()
+        return store
+    
+    @classmethod
+    def load(cls, persist_directory: Path, embedding: Embeddings) -> Optional['MemoryVectorStore']:
+        """Load a persisted store, or None if there is none"""
+        persist_directory = Path(persist_directory)
+        docs_path = persist_directory / cls.DOCS_FILE
+        vectors_path = persist_directory / cls.VECTORS_FILE
+        if not docs_path.exists() or not vectors_path.exists():
+            return None
+        
+        with open(docs_path, 'rb') as f:
+            documents = pickle.load(f)
+        return cls(embedding, np.load(vectors_path), documents, persist_directory)
+    
+    def save(self) -> None:
+        """Write vectors and documents to persist_directory"""
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        np.save(self.persist_directory / self.VECTORS_FILE, self.vectors)
+        with open(self.persist_directory / self.DOCS_FILE, 'wb') as f:
+            pickle.dump(self.documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def _similarities(self, q: np.ndarray) -> np.ndarray:
+        """Cosine similarity of q against every stored vector"""
+        if simsimd is not None:
+            # SimSIMD computes on float16 directly
+            q16 = q.astype(np.float16)[None, :]
+            return 1.0 - np.asarray(simsimd.cdist(q16, self.vectors, metric='cosine'))[0]
+        
+        denom = self._norms * np.linalg.norm(q)
+        denom[denom == 0] = 1.0
+        return (self.vectors.astype(np.float32) @ q) / denom
+    
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Top-k documents with cosine distance"""
+        n = len(self.documents)
+        if n == 0 or k <= 0:
+            return []
+        
+        q = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        sims = self._similarities(q)
+        
+        # Partial selection of the k best, then order just those
+        k = min(k, n)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return [(self.documents[i], 1.0 - float(sims[i])) for i in top]
+    
+    def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> StoreRetriever:
+        """LangChain retriever returning the top k documents"""
+        return StoreRetriever(store=self, k=(search_kwargs or {}).get('k', 4))
@@ -103,9 +103,7 @@ int main() {
             
             # Display the PlantUML content
             console.print("\n[yellow]PlantUML Content:[/yellow]")
-            with open(path, 'r') as f:
-                content = f.read()
-                console.print(content)
+            console.print(Path(path).read_text(encoding='utf-8'))
     
     # Generate overview diagram
     console.print("\n[blue]5. Generating overview diagram...[/blue]")
@@ -128,5 +126,5 @@ if __name__ == '__main__':
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         import traceback
-        traceback.print_exc()
+        sys.stderr.write(traceback.format_exc())
         sys.exit(1)
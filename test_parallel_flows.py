@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Check that batched v2 flow generation across processes matches the serial path
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src_v2 to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src_v2.ast_parser import ASTParser
+from src_v2.diagram_generator import DiagramGenerator, _PARALLEL_FLOW_THRESHOLD
+
+# Files of the generated fixture project, and functions per file
+_FILES = 4
+_FUNCS_PER_FILE = 12
+
+
+def _fixture_source(index: int) -> str:
+    """One file of control flow functions, plus an overload shared by every file"""
+    parts = [f"// módulo {index}\n"]
+    for i in range(_FUNCS_PER_FILE):
+        parts.append(
+            f"int step_{index}_{i}(int value) {{\n"
+            f"    if (value > {i}) {{\n"
+            f"        for (int j = 0; j < value; j++) {{ process(j); }}\n"
+            f"    }} else {{\n"
+            f"        while (value < {i}) {{ value++; }}\n"
+            f"    }}\n"
+            f"    return value;\n"
+            f"}}\n"
+        )
+    parts.append(f"int shared(int value) {{ if (value) {{ return {index}; }} return 0; }}\n")
+    return "".join(parts)
+
+
+def _generate(parser: ASTParser, output_dir: Path, max_workers: int) -> dict:
+    """Generate every flow into output_dir; returns file name -> text"""
+    generator = DiagramGenerator({'output_dir': str(output_dir), 'max_workers': max_workers})
+    funcs = [f for f in parser.get_functions() if f.body_range]
+    paths = generator.generate_function_flows(funcs, parser)
+    return {Path(path).name: Path(path).read_text(encoding='utf-8') for path in paths}
+
+
+def test_parallel_flows() -> bool:
+    """Generate the same batch serially and across a pool, and compare"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        project = tmp / "project"
+        project.mkdir()
+        for index in range(_FILES):
+            (project / f"module_{index}.cpp").write_text(_fixture_source(index), encoding='utf-8')
+        
+        parser = ASTParser({'file_extensions': ['.cpp']})
+        parser.parse_project(str(project))
+        count = sum(1 for f in parser.get_functions() if f.body_range)
+        print(f"1. Parsed {count} functions with bodies")
+        if count < _PARALLEL_FLOW_THRESHOLD:
+            print(f"✗ Batch of {count} is below the pool threshold ({_PARALLEL_FLOW_THRESHOLD})")
+            return False
+        
+        print("2. Generating flows serially...")
+        serial = _generate(parser, tmp / "serial", max_workers=1)
+        print("3. Generating flows across worker processes...")
+        pooled = _generate(parser, tmp / "pooled", max_workers=2)
+    
+    if serial != pooled:
+        differing = sorted(set(serial) ^ set(pooled) | {n for n in serial if serial[n] != pooled.get(n)})
+        print(f"✗ Pool output differs from serial output: {differing[:5]}")
+        return False
+    
+    print(f"✓ {len(pooled)} diagrams identical (overloads resolved to the same file)")
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(0 if test_parallel_flows() else 1)
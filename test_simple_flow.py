@@ -3,7 +3,10 @@
 Simple test script for control flow diagram generation (no dependencies)
 """
 
+import io
 import sys
+import hashlib
+import textwrap
 from pathlib import Path
 
 # Add src to path
@@ -11,22 +14,11 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.cpp_parser import CPPCodeParser
 from src.plantuml_generator import PlantUMLGenerator
+from parse_cache import parse_cached
 
 
-def test_control_flow():
-    """Test control flow diagram generation"""
-    
-    print("=" * 60)
-    print("Testing Control Flow Diagram Generation")
-    print("=" * 60)
-    
-    # Create test directory
-    test_dir = Path("test_code")
-    test_dir.mkdir(exist_ok=True)
-    
-    # Create test C++ file with control flow
-    test_cpp = test_dir / "test.cpp"
-    test_cpp.write_text("""
+# Test C++ source; rewritten on disk only when the copy there differs
+_FIXTURE_CPP = """
 #include <iostream>
 
 int calculateSum(int a, int b) {
@@ -71,7 +63,26 @@ int main() {
     
     return 0;
 }
-""")
+"""
+_FIXTURE_HASH = hashlib.blake2b(_FIXTURE_CPP.encode()).digest()
+
+
+def test_control_flow():
+    """Test control flow diagram generation"""
+    
+    print("=" * 60)
+    print("Testing Control Flow Diagram Generation")
+    print("=" * 60)
+    
+    # Create test directory
+    test_dir = Path("test_code")
+    if not test_dir.exists():
+        test_dir.mkdir()
+    
+    # Create test C++ file with control flow
+    test_cpp = test_dir / "test.cpp"
+    if not test_cpp.exists() or hashlib.blake2b(test_cpp.read_bytes()).digest() != _FIXTURE_HASH:
+        test_cpp.write_text(_FIXTURE_CPP)
     
     print(f"\n✓ Created test file: {test_cpp}")
     
@@ -87,18 +98,22 @@ int main() {
     
     # Parse the project
     print(f"2. Parsing test code from {test_dir}...")
-    parser.parse_project(str(test_dir))
+    parse_cached(parser, test_dir, test_cpp)
     
     print(f"\n✓ Found {len(parser.functions)} functions")
     
     # Show functions with control flow
-    print("\n3. Functions with control flow:")
+    # Listed into one buffer and written once instead of a print per node
+    buf = io.StringIO()
+    buf.write("\n3. Functions with control flow:\n")
     for func in parser.functions:
         flow_count = len(func.control_flow) if func.control_flow else 0
-        print(f"   - {func.name}: {flow_count} control flow nodes")
+        buf.write(f"   - {func.name}: {flow_count} control flow nodes\n")
         if func.control_flow:
             for node in func.control_flow[:3]:  # Show first 3 nodes
-                print(f"      • {node.type}: {node.label or node.condition or ''}")
+                buf.write(f"      • {node.type}: {node.label or node.condition or ''}\n")
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
     
     # Initialize diagram generator
     flowchart_config = {
@@ -122,10 +137,10 @@ int main() {
             # Show the PlantUML content
             print(f"\n   PlantUML content for {func.name}:")
             print("   " + "-" * 50)
-            with open(path, 'r') as f:
-                for line in f:
-                    print(f"   {line}", end='')
+            content = Path(path).read_text(encoding='utf-8')
+            sys.stdout.write(textwrap.indent(content, "   ", lambda line: True))
             print("   " + "-" * 50)
+    sys.stdout.flush()
     
     # Generate overview diagram
     print("\n6. Generating overview function call diagram...")
@@ -152,5 +167,5 @@ if __name__ == '__main__':
     except Exception as e:
         print(f"\n✗ Error: {e}")
         import traceback
-        traceback.print_exc()
+        sys.stderr.write(traceback.format_exc())
         sys.exit(1)
@@ -4,292 +4,470 @@ Comprehensive installation verification script
 Tests all imports and dependencies for LangChain 1.1.3 compatibility
 """
 
+import os
 import sys
+import site
+import time
+import hashlib
+import argparse
+import subprocess
+import http.client
+import importlib
+import json
+import threading
+from importlib import metadata as _md, util as _util
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-print("=" * 70)
-print("C++ Analysis Agent - Installation Verification")
-print("=" * 70)
-print()
-
-# Track errors
-errors = []
-warnings = []
-
-# 1. Check Python version
-print("1. Checking Python version...")
-if sys.version_info >= (3, 11):
-    print(f"   ✓ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
-else:
-    errors.append(f"Python 3.11+ required, found {sys.version_info.major}.{sys.version_info.minor}")
-    print(f"   ✗ Python {sys.version_info.major}.{sys.version_info.minor} (3.11+ required)")
-
-# 2. Check core imports
-print("\n2. Checking core imports...")
-try:
-    import yaml
-    print("   ✓ pyyaml")
-except ImportError as e:
-    errors.append(f"pyyaml: {e}")
-    print("   ✗ pyyaml")
-
-try:
-    from rich.console import Console
-    print("   ✓ rich")
-except ImportError as e:
-    errors.append(f"rich: {e}")
-    print("   ✗ rich")
-
-try:
-    from dotenv import load_dotenv
-    print("   ✓ python-dotenv")
-except ImportError as e:
-    errors.append(f"python-dotenv: {e}")
-    print("   ✗ python-dotenv")
-
-# 3. Check LangChain packages
-print("\n3. Checking LangChain packages...")
-try:
-    import langchain
-    version = getattr(langchain, '__version__', 'unknown')
-    print(f"   ✓ langchain ({version})")
-except ImportError as e:
-    errors.append(f"langchain: {e}")
-    print("   ✗ langchain (REQUIRED)")
-
-try:
-    import langchain_core
-    version = getattr(langchain_core, '__version__', 'unknown')
-    print(f"   ✓ langchain-core ({version})")
-except ImportError as e:
-    errors.append(f"langchain-core: {e}")
-    print("   ✗ langchain-core")
-
-try:
-    import langchain_community
-    version = getattr(langchain_community, '__version__', 'unknown')
-    print(f"   ✓ langchain-community ({version})")
-except ImportError as e:
-    errors.append(f"langchain-community: {e}")
-    print("   ✗ langchain-community")
-
-try:
-    import langchain_text_splitters
-    print("   ✓ langchain-text-splitters")
-except ImportError as e:
-    errors.append(f"langchain-text-splitters: {e}")
-    print("   ✗ langchain-text-splitters")
-
-try:
-    import langchain_ollama
-    print("   ✓ langchain-ollama")
-except ImportError as e:
-    errors.append(f"langchain-ollama: {e}")
-    print("   ✗ langchain-ollama (REQUIRED)")
-
-# 4. Check specific LangChain imports
-print("\n4. Checking LangChain module structure...")
-try:
-    from langchain_core.prompts import PromptTemplate
-    print("   ✓ langchain_core.prompts")
-except ImportError as e:
-    errors.append(f"langchain_core.prompts: {e}")
-    print("   ✗ langchain_core.prompts")
-
-try:
-    from langchain_core.documents import Document
-    print("   ✓ langchain_core.documents")
-except ImportError as e:
-    errors.append(f"langchain_core.documents: {e}")
-    print("   ✗ langchain_core.documents")
-
-try:
-    from langchain_core.runnables import RunnablePassthrough
-    print("   ✓ langchain_core.runnables")
-except ImportError as e:
-    errors.append(f"langchain_core.runnables: {e}")
-    print("   ✗ langchain_core.runnables")
-
-try:
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    print("   ✓ langchain_text_splitters.RecursiveCharacterTextSplitter")
-except ImportError as e:
-    errors.append(f"RecursiveCharacterTextSplitter: {e}")
-    print("   ✗ langchain_text_splitters.RecursiveCharacterTextSplitter")
-
-# 5. Check ChromaDB
-print("\n5. Checking vector database...")
-try:
-    import chromadb
-    version = getattr(chromadb, '__version__', 'unknown')
-    print(f"   ✓ chromadb ({version})")
-except ImportError as e:
-    errors.append(f"chromadb: {e}")
-    print("   ✗ chromadb (REQUIRED)")
-
-try:
-    from langchain_chroma import Chroma
-    print("   ✓ langchain-chroma (Chroma vectorstore)")
-except ImportError as e:
-    errors.append(f"langchain-chroma: {e}")
-    print("   ✗ langchain-chroma (REQUIRED)")
-    print("      Install with: pip install langchain-chroma")
-
-# 6. Check tree-sitter
-print("\n6. Checking code parser...")
-try:
-    import tree_sitter
-    version = getattr(tree_sitter, '__version__', 'unknown')
-    print(f"   ✓ tree-sitter ({version})")
-except ImportError as e:
-    errors.append(f"tree-sitter: {e}")
-    print("   ✗ tree-sitter")
-
-try:
-    import tree_sitter_cpp
-    print("   ✓ tree-sitter-cpp")
-except ImportError as e:
-    errors.append(f"tree-sitter-cpp: {e}")
-    print("   ✗ tree-sitter-cpp (REQUIRED)")
-
-try:
-    from tree_sitter import Language, Parser
-    print("   ✓ tree-sitter API")
-except ImportError as e:
-    errors.append(f"tree-sitter API: {e}")
-    print("   ✗ tree-sitter API")
-
-# 7. Check visualization
-print("\n7. Checking visualization tools...")
-try:
-    import graphviz
-    version = getattr(graphviz, '__version__', 'unknown')
-    print(f"   ✓ graphviz ({version})")
-except ImportError as e:
-    errors.append(f"graphviz: {e}")
-    print("   ✗ graphviz (REQUIRED for flowcharts)")
-
-try:
-    from PIL import Image
-    import PIL
-    version = getattr(PIL, '__version__', 'unknown')
-    print(f"   ✓ pillow ({version})")
-except ImportError as e:
-    warnings.append(f"pillow: {e}")
-    print("   ⚠ pillow (optional)")
-
-# 8. Check Ollama integration
-print("\n8. Checking Ollama integration...")
-try:
-    from langchain_ollama import ChatOllama, OllamaEmbeddings
-    print("   ✓ ChatOllama")
-    print("   ✓ OllamaEmbeddings")
-except ImportError as e:
-    errors.append(f"Ollama integration: {e}")
-    print("   ✗ Ollama integration")
-
-# 9. Test Ollama connection
-print("\n9. Testing Ollama connection...")
-try:
-    import requests
-    response = requests.get('http://localhost:11434/api/tags', timeout=2)
-    if response.status_code == 200:
-        print("   ✓ Ollama server is running")
-        data = response.json()
-        models = data.get('models', [])
-        print(f"   ✓ Found {len(models)} models")
-        
-        # Check for required models
-        model_names = [m.get('name', '') for m in models]
-        if any('qwen' in name for name in model_names):
-            print("   ✓ Qwen model available")
-        else:
-            warnings.append("No Qwen model found")
-            print("   ⚠ No Qwen model found")
-            
-        if any('jina' in name or 'embed' in name for name in model_names):
-            print("   ✓ Embedding model available")
-        else:
-            warnings.append("No embedding model found")
-            print("   ⚠ No embedding model found")
-    else:
-        warnings.append("Ollama server not responding properly")
-        print("   ⚠ Ollama server not responding properly")
-except Exception as e:
-    warnings.append(f"Cannot connect to Ollama: {e}")
-    print(f"   ⚠ Cannot connect to Ollama: {e}")
-    print("   Note: Make sure Ollama is running (ollama serve)")
-
-# 10. Test agent imports
-print("\n10. Testing agent modules...")
+# Agent modules (section 10) are imported from the repository root
 sys.path.insert(0, str(Path(__file__).parent))
 
-try:
-    from src.config_loader import ConfigLoader
-    print("   ✓ ConfigLoader")
-except ImportError as e:
-    errors.append(f"ConfigLoader: {e}")
-    print(f"   ✗ ConfigLoader: {e}")
-
-try:
-    from src.cpp_parser import CPPCodeParser
-    print("   ✓ CPPCodeParser")
-except ImportError as e:
-    errors.append(f"CPPCodeParser: {e}")
-    print(f"   ✗ CPPCodeParser: {e}")
-
-try:
-    from src.rag_system import RAGSystem
-    print("   ✓ RAGSystem")
-except ImportError as e:
-    errors.append(f"RAGSystem: {e}")
-    print(f"   ✗ RAGSystem: {e}")
-
-try:
-    from src.flowchart_generator import FlowchartGenerator
-    print("   ✓ FlowchartGenerator")
-except ImportError as e:
-    errors.append(f"FlowchartGenerator: {e}")
-    print(f"   ✗ FlowchartGenerator: {e}")
-
-try:
-    from src.agent import CPPAnalysisAgent
-    print("   ✓ CPPAnalysisAgent")
-except ImportError as e:
-    errors.append(f"CPPAnalysisAgent: {e}")
-    print(f"   ✗ CPPAnalysisAgent: {e}")
-
-# Summary
-print("\n" + "=" * 70)
-print("VERIFICATION SUMMARY")
-print("=" * 70)
-
-if not errors and not warnings:
-    print("✓ ALL CHECKS PASSED!")
-    print("\nYour installation is complete and ready to use.")
-    print("\nNext steps:")
-    print("  1. python3 main.py analyze /path/to/cpp/project")
-    print("  2. python3 main.py flowchart --type function_call")
-    print("  3. python3 main.py query 'Your question'")
-    sys.exit(0)
-elif not errors:
-    print(f"✓ PASSED with {len(warnings)} warning(s)")
-    print("\nWarnings:")
-    for w in warnings:
-        print(f"  ⚠ {w}")
-    print("\nYour installation should work, but some features may be limited.")
-    sys.exit(0)
-else:
-    print(f"✗ FAILED with {len(errors)} error(s)")
-    print("\nErrors:")
-    for e in errors:
-        print(f"  ✗ {e}")
-    if warnings:
-        print("\nWarnings:")
-        for w in warnings:
-            print(f"  ⚠ {w}")
-    print("\nPlease fix the errors above before using the agent.")
-    print("\nTo install missing packages:")
-    print("  pip install -r requirements.txt")
-    sys.exit(1)
 
+class Check(NamedTuple):
+    """One import probe and how its result is reported"""
+    label: str
+    module: str
+    names: Tuple[str, ...] = ()  # imported from module, like `from module import names`
+    required: bool = True  # missing -> error, otherwise a warning
+    note: str = ""  # appended to the failure line
+    dist: Optional[str] = None  # distribution name, for the version
+    requires: Tuple[str, ...] = ()  # labels of checks that must pass first
+
+
+# (version, error) of a check that ran
+Result = Tuple[Optional[str], Optional[Exception]]
+
+
+# A passing run is trusted this long while the installed packages are unchanged
+_CACHE_TTL = 24 * 3600
+
+# Section title -> checks, in report order; section 9 is the Ollama server probe
+SECTIONS: Tuple[Tuple[str, Optional[Tuple[Check, ...]]], ...] = (
+    ("2. Checking core imports...", (
+        Check("pyyaml", "yaml", dist="PyYAML"),
+        Check("rich", "rich.console", ("Console",)),
+        Check("python-dotenv", "dotenv", ("load_dotenv",)),
+    )),
+    ("3. Checking LangChain packages...", (
+        Check("langchain", "langchain", note=" (REQUIRED)", dist="langchain"),
+        Check("langchain-core", "langchain_core", dist="langchain-core"),
+        Check("langchain-community", "langchain_community", dist="langchain-community"),
+        Check("langchain-text-splitters", "langchain_text_splitters", dist="langchain-text-splitters"),
+        Check("langchain-ollama", "langchain_ollama", note=" (REQUIRED)", dist="langchain-ollama"),
+    )),
+    ("4. Checking LangChain module structure...", (
+        Check("langchain_core.prompts", "langchain_core.prompts", ("PromptTemplate",),
+              requires=("langchain-core",)),
+        Check("langchain_core.documents", "langchain_core.documents", ("Document",),
+              requires=("langchain-core",)),
+        Check("langchain_core.runnables", "langchain_core.runnables", ("RunnablePassthrough",),
+              requires=("langchain-core",)),
+        Check("langchain_text_splitters.RecursiveCharacterTextSplitter",
+              "langchain_text_splitters", ("RecursiveCharacterTextSplitter",),
+              requires=("langchain-text-splitters",)),
+    )),
+    ("5. Checking vector database...", (
+        Check("chromadb", "chromadb", note=" (REQUIRED)", dist="chromadb"),
+        Check("langchain-chroma", "langchain_chroma", ("Chroma",),
+              note=" (REQUIRED)\n      Install with: pip install langchain-chroma",
+              requires=("chromadb", "langchain-core")),
+    )),
+    ("6. Checking code parser...", (
+        Check("tree-sitter", "tree_sitter", dist="tree-sitter"),
+        Check("tree-sitter-cpp", "tree_sitter_cpp", note=" (REQUIRED)", dist="tree-sitter-cpp"),
+        Check("tree-sitter API", "tree_sitter", ("Language", "Parser"), requires=("tree-sitter",)),
+    )),
+    ("7. Checking visualization tools...", (
+        Check("graphviz", "graphviz", note=" (REQUIRED for flowcharts)", dist="graphviz"),
+        Check("pillow", "PIL", required=False, dist="Pillow"),
+    )),
+    ("8. Checking Ollama integration...", (
+        Check("ChatOllama", "langchain_ollama", ("ChatOllama",), requires=("langchain-ollama",)),
+        Check("OllamaEmbeddings", "langchain_ollama", ("OllamaEmbeddings",), requires=("langchain-ollama",)),
+    )),
+    ("9. Testing Ollama connection...", None),
+    ("10. Testing agent modules...", (
+        Check("ConfigLoader", "src.config_loader", ("ConfigLoader",),
+              requires=("pyyaml", "python-dotenv")),
+        Check("CPPCodeParser", "src.cpp_parser", ("CPPCodeParser",),
+              requires=("rich", "tree-sitter-cpp", "tree-sitter API")),
+        Check("RAGSystem", "src.rag_system", ("RAGSystem",),
+              requires=("chromadb", "langchain-chroma", "OllamaEmbeddings", "langchain_core.documents",
+                        "langchain_text_splitters.RecursiveCharacterTextSplitter")),
+        Check("FlowchartGenerator", "src.flowchart_generator", ("FlowchartGenerator",),
+              requires=("rich", "graphviz")),
+        Check("CPPAnalysisAgent", "src.agent", ("CPPAnalysisAgent",),
+              requires=("ChatOllama", "langchain_core.prompts", "langchain_core.runnables",
+                        "ConfigLoader", "CPPCodeParser", "RAGSystem")),
+    )),
+)
+
+# Every check in report order, flattened once
+CHECKS: Tuple[Check, ...] = tuple(check for _, section in SECTIONS for check in section or ())
+
+# Checks of installed packages, whose passing result is cached; the agent's
+# own modules (src.*) and the Ollama server are checked on every run
+PACKAGE_CHECKS: Tuple[Check, ...] = tuple(check for check in CHECKS if not check.module.startswith('src.'))
+
+
+# Several checks resolve the same module or distribution; failures are
+# not cached and are retried by the next check that needs them
+@lru_cache(maxsize=None)
+def _import(name: str) -> Any:
+    """importlib.import_module, memoized"""
+    return importlib.import_module(name)
+
+
+@lru_cache(maxsize=None)
+def _dist_version(dist: Optional[str]) -> Optional[str]:
+    """Installed version of a distribution, from its metadata only"""
+    if dist is None:
+        return None
+    try:
+        return _md.version(dist)
+    except _md.PackageNotFoundError:
+        return None
+
+
+def _probe_module(check: Check, deep: bool) -> Optional[str]:
+    """
+    Version of an installed package; raises ImportError if it is missing
+    
+    The module is only located and the version read from its dist-info,
+    without executing the package (or loading its extension modules),
+    unless deep is set.
+    """
+    if deep:
+        _import(check.module)
+    elif _util.find_spec(check.module) is None:
+        raise ModuleNotFoundError(f"No module named '{check.module}'", name=check.module)
+    return _dist_version(check.dist)
+
+
+def _probe_symbols(check: Check) -> None:
+    """Import check.names from check.module; raises ImportError like `from ... import`"""
+    module = _import(check.module)
+    for name in check.names:
+        if not hasattr(module, name):
+            raise ImportError(f"cannot import name '{name}' from '{check.module}'")
+
+
+def _run(check: Check, deep: bool = False) -> Result:
+    """Run one probe; (version, None) on success, (None, error) otherwise"""
+    try:
+        if check.names:
+            _probe_symbols(check)
+            return None, None
+        return _probe_module(check, deep), None
+    except Exception as e:
+        # Not only ImportError: a syntax error in an agent module is a
+        # failed check, not a crash of the whole report
+        return None, e
+
+
+def _run_checks(
+    checks: Tuple[Check, ...],
+    deep: bool = False,
+    passed: Tuple[str, ...] = ()
+) -> Tuple[Dict[str, Result], Dict[str, str]]:
+    """
+    Run checks concurrently, each once its prerequisites have passed
+    
+    A check whose prerequisite failed or was skipped is not run, so one
+    missing package is reported once instead of as a chain of ImportErrors.
+    Imports within one top-level package are serialized: a failed import
+    racing a second importer of that package reports a misleading
+    partial-module error.
+    
+    Args:
+        checks: Checks to run
+        deep: Import packages instead of only locating them
+        passed: Labels of prerequisites known to pass, which are not run
+    
+    Returns:
+        (label -> result of checks that ran, label -> failed prerequisite)
+    """
+    locks = {check.module.partition('.')[0]: threading.Lock() for check in checks}
+    
+    def run(check: Check) -> Result:
+        with locks[check.module.partition('.')[0]]:
+            return _run(check, deep)
+    
+    results: Dict[str, Result] = {label: (None, None) for label in passed}
+    skipped: Dict[str, str] = {}
+    waiting = list(checks)
+    running: Dict[Future, str] = {}
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        while waiting or running:
+            # Skip or start whatever is decided; repeat as skips cascade
+            progress = True
+            while progress:
+                progress = False
+                for check in list(waiting):
+                    failed = next((dep for dep in check.requires if dep in skipped
+                                   or (dep in results and results[dep][1] is not None)), None)
+                    if failed is not None:
+                        skipped[check.label] = failed
+                    elif all(dep in results for dep in check.requires):
+                        running[pool.submit(run, check)] = check.label
+                    else:
+                        continue
+                    waiting.remove(check)
+                    progress = True
+            
+            if not running:
+                raise ValueError(f"Unknown prerequisite in {[check.label for check in waiting]}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    
+    return results, skipped
+
+
+def _report(
+    check: Check,
+    version: Optional[str],
+    error: Optional[Exception],
+    errors: List[str],
+    warnings: List[str],
+    emit: Callable[[str], None]
+) -> None:
+    """Emit one check result and record its failure"""
+    if error is None:
+        emit(f"   ✓ {check.label}" + (f" ({version})" if version else ""))
+    elif check.required:
+        errors.append(f"{check.label}: {error}")
+        emit(f"   ✗ {check.label}{check.note}")
+    else:
+        warnings.append(f"{check.label}: {error}")
+        emit(f"   ⚠ {check.label} (optional)")
+
+
+def _check_ollama() -> Tuple[List[str], List[str]]:
+    """Query the local Ollama server; returns (output lines, warnings)"""
+    lines: List[str] = []
+    warnings: List[str] = []
+    # One localhost GET; http.client avoids loading requests and urllib3
+    conn = http.client.HTTPConnection('localhost', 11434, timeout=2)
+    try:
+        conn.request('GET', '/api/tags')
+        response = conn.getresponse()
+        if response.status == 200:
+            lines.append("   ✓ Ollama server is running")
+            data = json.loads(response.read())
+            models = data.get('models', [])
+            lines.append(f"   ✓ Found {len(models)} models")
+            
+            # Check for required models, once per distinct model name (the
+            # tags of one model share it)
+            has_qwen = has_embed = False
+            for stem in {m.get('name', '').split(':')[0].lower() for m in models}:
+                has_qwen |= 'qwen' in stem
+                has_embed |= 'jina' in stem or 'embed' in stem
+            
+            if has_qwen:
+                lines.append("   ✓ Qwen model available")
+            else:
+                warnings.append("No Qwen model found")
+                lines.append("   ⚠ No Qwen model found")
+            
+            if has_embed:
+                lines.append("   ✓ Embedding model available")
+            else:
+                warnings.append("No embedding model found")
+                lines.append("   ⚠ No embedding model found")
+        else:
+            warnings.append("Ollama server not responding properly")
+            lines.append("   ⚠ Ollama server not responding properly")
+    except Exception as e:
+        warnings.append(f"Cannot connect to Ollama: {e}")
+        lines.append(f"   ⚠ Cannot connect to Ollama: {e}")
+        lines.append("   Note: Make sure Ollama is running (ollama serve)")
+    finally:
+        conn.close()
+    return lines, warnings
+
+
+def _cache_marker() -> Path:
+    """
+    Marker file of a run whose package checks all passed
+    
+    Keyed by interpreter and site-packages mtimes, so installing or removing
+    a package invalidates it.
+    """
+    fingerprint = (
+        sys.executable,
+        sys.version,
+        sorted((p, os.path.getmtime(p)) for p in site.getsitepackages() if os.path.isdir(p))
+    )
+    key = hashlib.sha1(repr(fingerprint).encode()).hexdigest()[:16]
+    return Path.home() / ".cache" / "cpp_agent" / f"verify-{key}.ok"
+
+
+def _report_pip_check(
+    proc: subprocess.Popen,
+    errors: List[str],
+    warnings: List[str],
+    emit: Callable[[str], None]
+) -> None:
+    """Emit the result of a running `pip check` and record broken requirements"""
+    try:
+        output, _ = proc.communicate(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        warnings.append("pip check timed out")
+        emit("   ⚠ pip check timed out")
+        return
+    
+    if proc.returncode == 0:
+        emit("   ✓ No broken requirements")
+        return
+    for line in output.splitlines():
+        if line.strip():
+            errors.append(f"pip check: {line}")
+            emit(f"   ✗ {line}")
+
+
+def _summary(errors: List[str], warnings: List[str], emit: Callable[[str], None]) -> int:
+    """Emit the verification summary; returns the exit code"""
+    emit("\n" + "=" * 70)
+    emit("VERIFICATION SUMMARY")
+    emit("=" * 70)
+    
+    if not errors and not warnings:
+        emit("✓ ALL CHECKS PASSED!")
+        emit("\nYour installation is complete and ready to use.")
+        emit("\nNext steps:")
+        emit("  1. python3 main.py analyze /path/to/cpp/project")
+        emit("  2. python3 main.py flowchart --type function_call")
+        emit("  3. python3 main.py query 'Your question'")
+        return 0
+    elif not errors:
+        emit(f"✓ PASSED with {len(warnings)} warning(s)")
+        emit("\nWarnings:")
+        for w in warnings:
+            emit(f"  ⚠ {w}")
+        emit("\nYour installation should work, but some features may be limited.")
+        return 0
+    else:
+        emit(f"✗ FAILED with {len(errors)} error(s)")
+        emit("\nErrors:")
+        for e in errors:
+            emit(f"  ✗ {e}")
+        if warnings:
+            emit("\nWarnings:")
+            for w in warnings:
+                emit(f"  ⚠ {w}")
+        emit("\nPlease fix the errors above before using the agent.")
+        emit("\nTo install missing packages:")
+        emit("  pip install -r requirements.txt")
+        return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run every check and print the summary; returns the exit code"""
+    parser = argparse.ArgumentParser(description="Verify the C++ Analysis Agent installation")
+    parser.add_argument('--force', action='store_true', help="Ignore a cached passing result")
+    parser.add_argument('--deep', action='store_true',
+                        help="Import every package instead of only locating it")
+    parser.add_argument('--pip-check', action='store_true',
+                        help="Also report broken requirements with pip check")
+    args = parser.parse_args(argv)
+    
+    marker = _cache_marker()
+    cached = not args.force and marker.exists() and time.time() - marker.stat().st_mtime < _CACHE_TTL
+    
+    # The Ollama round-trip is network-bound; start it before anything else
+    # so it overlaps the import checks entirely
+    ollama: List[Tuple[List[str], List[str]]] = []
+    ollama_thread = threading.Thread(target=lambda: ollama.append(_check_ollama()), daemon=True)
+    ollama_thread.start()
+    
+    # pip check is an interpreter start plus a metadata scan; it runs alongside
+    pip_check = None
+    if args.pip_check:
+        pip_check = subprocess.Popen(
+            [sys.executable, '-m', 'pip', 'check', '--disable-pip-version-check'],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+    
+    # The report is assembled in memory and written once at the end
+    out: List[str] = []
+    emit = out.append
+    
+    emit("=" * 70)
+    emit("C++ Analysis Agent - Installation Verification")
+    emit("=" * 70)
+    emit("")
+    if cached:
+        emit("Package checks passed earlier and are cached (run with --force to re-check)")
+        emit("")
+    
+    # Track errors
+    errors = []
+    warnings = []
+    
+    # 1. Check Python version
+    emit("1. Checking Python version...")
+    if sys.version_info >= (3, 11):
+        emit(f"   ✓ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
+    else:
+        errors.append(f"Python 3.11+ required, found {sys.version_info.major}.{sys.version_info.minor}")
+        emit(f"   ✗ Python {sys.version_info.major}.{sys.version_info.minor} (3.11+ required)")
+    
+    # Imports are disk I/O and C-extension loading, so probes overlap in threads
+    if cached:
+        cached_labels = tuple(check.label for check in PACKAGE_CHECKS)
+        live = tuple(check for check in CHECKS if check not in PACKAGE_CHECKS)
+        results, skipped = _run_checks(live, deep=args.deep, passed=cached_labels)
+    else:
+        results, skipped = _run_checks(CHECKS, deep=args.deep)
+    
+    for title, section in SECTIONS:
+        emit(f"\n{title}")
+        if section is None:
+            ollama_thread.join(timeout=3)
+            ollama_lines, ollama_warnings = ollama[0] if ollama else (
+                ["   ⚠ Ollama server did not answer in time"],
+                ["Ollama server did not answer in time"]
+            )
+            for line in ollama_lines:
+                emit(line)
+            warnings.extend(ollama_warnings)
+            continue
+        for check in section:
+            if check.label in skipped:
+                emit(f"   - {check.label} (skipped, needs {skipped[check.label]})")
+            elif cached and check in PACKAGE_CHECKS:
+                emit(f"   ✓ {check.label} (cached)")
+            else:
+                _report(check, *results[check.label], errors, warnings, emit)
+    
+    if pip_check is not None:
+        emit("\n11. Checking installed requirements (pip check)...")
+        _report_pip_check(pip_check, errors, warnings, emit)
+    
+    code = _summary(errors, warnings, emit)
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
+    
+    # Only package results are cached, so Ollama or agent module failures
+    # do not stop the next run from skipping the package checks
+    packages_ok = sys.version_info >= (3, 11) and all(
+        check.label not in skipped and results[check.label][1] is None for check in PACKAGE_CHECKS
+    )
+    if not cached and packages_ok:
+        try:
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        except OSError:
+            pass
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())